@@ -0,0 +1,120 @@
+"""
+Month-partitioned build of the churn feature table.
+
+Replaces the monolithic ``sql/input.sql`` rebuild: one mapped task per month
+computes that month's features and 32-day-lookahead labels. Partitions whose
+fingerprint did not change are skipped, training only starts once every
+expected partition is in place, and only if at least one partition changed.
+
+Configuration (environment variables, see ``include/feature_build.py``):
+
+- ``CHURN_FEATURES_BACKEND``: ``bigquery`` (default) or ``duckdb`` for local runs
+- ``CHURN_FEATURES_MAX_PARALLEL``: partition tasks running at once (default 4)
+- ``CHURN_FEATURES_POOL``: Airflow pool of the partition tasks (default ``default_pool``)
+"""
+import logging
+from datetime import datetime
+
+from airflow.exceptions import AirflowFailException
+from airflow.sdk import Variable, dag, task
+from include.feature_build import (
+    STATE_VARIABLE,
+    FeatureBuildSettings,
+    partition_is_current,
+    trigger_training,
+)
+
+logger = logging.getLogger(__name__)
+
+settings = FeatureBuildSettings.from_env()
+
+
+@dag(
+    schedule="@weekly",
+    start_date=datetime(2025, 1, 1),
+    catchup=False,
+    max_active_runs=1,
+    tags=["churn", "features"],
+)
+def churn_feature_build():
+    @task
+    def list_partitions():
+        """Months to build, each with the shared observation cutoff."""
+        months, observation_cutoff = settings.create_backend().list_months()
+        logger.info(f"{len(months)} partitions up to cutoff {observation_cutoff}")
+        return [
+            {"month": month, "observation_cutoff": observation_cutoff.isoformat()}
+            for month in months
+        ]
+
+    @task(max_active_tis_per_dagrun=settings.max_parallel, pool=settings.pool)
+    def build_partition(partition):
+        """Rebuild one month if its rows changed since the last successful run."""
+        month = partition["month"]
+        backend = settings.create_backend()
+        fingerprint = backend.fingerprint(month, partition["observation_cutoff"])
+
+        previous = Variable.get(STATE_VARIABLE, default={}, deserialize_json=True).get(month)
+        if partition_is_current(backend, month, fingerprint, previous):
+            logger.info(f"Partition {month} unchanged ({fingerprint['n_rows']} rows)")
+            return {"month": month, "changed": False, **fingerprint}
+
+        n_rows = backend.build(month, partition["observation_cutoff"])
+        if n_rows != fingerprint["n_rows"]:
+            raise AirflowFailException(
+                f"Partition {month} wrote {n_rows} rows, expected {fingerprint['n_rows']}"
+            )
+        logger.info(f"Rebuilt partition {month} ({n_rows} rows)")
+        return {"month": month, "changed": True, **fingerprint}
+
+    @task
+    def check_completeness(partitions, results):
+        """Fail unless every expected partition is stored with the expected row count."""
+        backend = settings.create_backend()
+        expected = [partition["month"] for partition in partitions]
+        built = {result["month"]: result for result in results}
+        stored = backend.stored_row_counts()
+
+        missing = [month for month in expected if month not in built]
+        mismatched = [
+            month
+            for month in expected
+            if month in built and stored.get(month, 0) != built[month]["n_rows"]
+        ]
+        if missing or mismatched:
+            raise AirflowFailException(
+                f"Incomplete feature table: missing {missing}, row count mismatch {mismatched}"
+            )
+
+        backend.publish(expected)
+        # Only record fingerprints once the whole table is consistent, so a failed
+        # run rebuilds its partitions next time
+        state = {
+            month: {"n_rows": built[month]["n_rows"], "checksum": built[month]["checksum"]}
+            for month in expected
+        }
+        Variable.set(STATE_VARIABLE, state, serialize_json=True)
+        changed = sorted(month for month, result in built.items() if result["changed"])
+        logger.info(f"{len(expected)} partitions complete, {len(changed)} changed: {changed}")
+        return changed
+
+    @task.short_circuit
+    def has_changes(changed):
+        """Skip training when no partition changed."""
+        return bool(changed)
+
+    @task
+    def start_training(changed):
+        """Trigger the trainer for the changed partitions."""
+        try:
+            return trigger_training(settings, changed)
+        except ValueError as e:
+            raise AirflowFailException(str(e)) from e
+
+    partitions = list_partitions()
+    results = build_partition.expand(partition=partitions)
+    changed = check_completeness(partitions, results)
+    has_changes(changed) >> start_training(changed)
+
+
+churn_feature_build()
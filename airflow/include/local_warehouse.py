@@ -0,0 +1,78 @@
+"""
+Synthetic DuckDB warehouse for running the feature build locally.
+
+Creates ``monthly_payments`` and ``user_table`` with the same columns as the
+BigQuery source tables:
+
+    python -m include.local_warehouse include/churn.duckdb
+"""
+import argparse
+
+
+def seed_warehouse(database, n_users=500, n_months=18, seed=0.42):
+    """
+    Create (or replace) the source tables in a DuckDB file.
+
+    Each user starts paying on a random day and pays about every 30 days for a
+    geometrically distributed number of months.
+
+    Args:
+        database: Path to the DuckDB file
+        n_users: Number of users
+        n_months: Length of the payment history in months
+        seed: DuckDB random seed in [-1, 1]
+
+    Returns:
+        Number of payments written
+    """
+    import duckdb
+
+    with duckdb.connect(str(database)) as con:
+        con.execute("SELECT setseed(?)", [seed])
+        con.execute(
+            """
+            CREATE OR REPLACE TABLE user_table AS
+            SELECT
+              i AS user_id,
+              random() AS f_0,
+              round(random() * 100) AS f_1,
+              floor(random() * 5)::INTEGER AS f_2,
+              round(random() * 10, 2) AS f_3,
+              -ln(1 - random()) AS f_4,
+              floor(random() * 30 * $n_months)::INTEGER AS start_day,
+              1 + floor(ln(1 - random()) / ln(0.9))::INTEGER AS tenure
+            FROM range($n_users) t(i)
+            """,
+            {"n_users": n_users, "n_months": n_months},
+        )
+        con.execute(
+            """
+            CREATE OR REPLACE TABLE monthly_payments AS
+            SELECT user_id, date
+            FROM (
+              SELECT
+                u.user_id,
+                TIMESTAMP '2023-01-01'
+                  + to_days(u.start_day + k * 30 + floor(random() * 9)::INTEGER - 4)
+                  + to_hours(floor(random() * 24)::INTEGER) AS date
+              FROM user_table u, range(u.tenure) t(k)
+            )
+            WHERE date >= TIMESTAMP '2023-01-01'
+              AND date < TIMESTAMP '2023-01-01' + to_days(30 * $n_months)
+            ORDER BY user_id, date
+            """,
+            {"n_months": n_months},
+        )
+        con.execute("ALTER TABLE user_table DROP COLUMN start_day")
+        con.execute("ALTER TABLE user_table DROP COLUMN tenure")
+        return con.execute("SELECT COUNT(*) FROM monthly_payments").fetchone()[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("database")
+    parser.add_argument("--n-users", type=int, default=500)
+    parser.add_argument("--n-months", type=int, default=18)
+    args = parser.parse_args()
+
+    print(f"Wrote {seed_warehouse(args.database, args.n_users, args.n_months)} payments")
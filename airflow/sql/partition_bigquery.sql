@@ -0,0 +1,70 @@
+-- One month of agg_input_table (BigQuery dialect).
+-- Same features and labels as input.sql, restricted to payments in
+-- [@month_start, @month_end) that lie before the observation cutoff.
+-- Labels only look 32 days past the month, never at the full history.
+WITH month_payments AS (
+  SELECT user_id, date
+  FROM `{payments_table}`
+  WHERE date >= @month_start
+    AND date < @month_end
+    AND date <= @observation_cutoff
+),
+user_first_payment AS (
+  -- Signup only needs each user's history up to the end of the month
+  SELECT
+    p.user_id,
+    MIN(p.date) AS first_payment_date
+  FROM `{payments_table}` p
+  WHERE p.date < @month_end
+    AND p.user_id IN (SELECT user_id FROM month_payments)
+  GROUP BY p.user_id
+),
+churn_target AS (
+  SELECT
+    a.user_id,
+    a.date AS payment_date,
+    CASE
+      -- No next payment within 32 days = churn
+      WHEN COUNT(b.date) = 0 THEN 1
+      -- Has next payment within 32 days = active
+      ELSE 0
+    END AS is_churn
+  FROM month_payments a
+  LEFT JOIN `{payments_table}` b
+    ON a.user_id = b.user_id
+    AND b.date > a.date
+    AND b.date <= TIMESTAMP_ADD(a.date, INTERVAL 32 DAY)
+    AND b.date >= @month_start
+    AND b.date < @lookahead_end
+  GROUP BY a.user_id, a.date
+)
+
+SELECT
+  mp.user_id,
+  mp.date AS payment_date,
+
+  -- Original user features
+  u.f_0,
+  u.f_1,
+  u.f_2,
+  u.f_3,
+  u.f_4,
+
+  -- New features
+  DATE_DIFF(DATE(mp.date), DATE(ufp.first_payment_date), MONTH) AS months_since_signup,
+  EXTRACT(MONTH FROM mp.date) AS calendar_month,
+  EXTRACT(MONTH FROM ufp.first_payment_date) AS signup_month,
+  CASE WHEN mp.date = ufp.first_payment_date THEN 1 ELSE 0 END AS is_first_month,
+  ct.is_churn,
+  CASE
+    WHEN ct.is_churn = 1 THEN 'churned'
+    ELSE 'active'
+  END AS status
+FROM month_payments mp
+INNER JOIN user_first_payment ufp
+  ON mp.user_id = ufp.user_id
+LEFT JOIN `{users_table}` u
+  ON mp.user_id = u.user_id
+LEFT JOIN churn_target ct
+  ON mp.user_id = ct.user_id
+  AND mp.date = ct.payment_date
@@ -0,0 +1,140 @@
+"""Month-partitioned feature build against the local DuckDB stand-in."""
+import duckdb
+import pytest
+from include.feature_build import DuckDBBackend, month_window, months_between, partition_is_current
+from include.local_warehouse import seed_warehouse
+
+# input.sql translated to DuckDB: the monolithic build the partitions must reproduce
+MONOLITHIC_QUERY = """
+WITH user_first_payment AS (
+  SELECT user_id, MIN(date) AS first_payment_date
+  FROM monthly_payments
+  GROUP BY user_id
+),
+data_window AS (
+  SELECT MAX(date) - INTERVAL 32 DAY AS observation_cutoff FROM monthly_payments
+),
+payment_features AS (
+  SELECT
+    mp.user_id,
+    mp.date,
+    DATE_DIFF('month', CAST(ufp.first_payment_date AS DATE), CAST(mp.date AS DATE))
+      AS months_since_signup,
+    MONTH(mp.date) AS calendar_month,
+    MONTH(ufp.first_payment_date) AS signup_month,
+    CASE WHEN ROW_NUMBER() OVER (PARTITION BY mp.user_id ORDER BY mp.date) = 1
+         THEN 1 ELSE 0 END AS is_first_month
+  FROM monthly_payments mp
+  INNER JOIN user_first_payment ufp ON mp.user_id = ufp.user_id
+  CROSS JOIN data_window dw
+  WHERE mp.date <= dw.observation_cutoff
+),
+churn_target AS (
+  SELECT
+    a.user_id,
+    a.date AS payment_date,
+    CASE WHEN COUNT(b.date) = 0 THEN 1 ELSE 0 END AS is_churn
+  FROM monthly_payments a
+  LEFT JOIN monthly_payments b
+    ON a.user_id = b.user_id
+    AND b.date > a.date
+    AND b.date <= a.date + INTERVAL 32 DAY
+  CROSS JOIN data_window dw
+  WHERE a.date <= dw.observation_cutoff
+  GROUP BY a.user_id, a.date
+)
+SELECT
+  pf.user_id, pf.date AS payment_date,
+  u.f_0, u.f_1, u.f_2, u.f_3, u.f_4,
+  pf.months_since_signup, pf.calendar_month, pf.signup_month, pf.is_first_month,
+  ct.is_churn,
+  CASE WHEN ct.is_churn = 1 THEN 'churned' ELSE 'active' END AS status
+FROM payment_features pf
+LEFT JOIN user_table u ON pf.user_id = u.user_id
+LEFT JOIN churn_target ct ON pf.user_id = ct.user_id AND pf.date = ct.payment_date
+ORDER BY pf.user_id, pf.date
+"""
+
+
+@pytest.fixture
+def backend(tmp_path):
+    database = tmp_path / "churn.duckdb"
+    seed_warehouse(database, n_users=200, n_months=8)
+    return DuckDBBackend(database, tmp_path / "partitions", "monthly_payments", "user_table")
+
+
+def build_all(backend):
+    months, observation_cutoff = backend.list_months()
+    for month in months:
+        backend.build(month, observation_cutoff)
+    backend.publish(months)
+    return months, observation_cutoff
+
+
+def test_months_between_crosses_year():
+    from datetime import date
+
+    assert months_between(date(2023, 11, 5), date(2024, 2, 1)) == [
+        "2023-11",
+        "2023-12",
+        "2024-01",
+        "2024-02",
+    ]
+
+
+def test_month_window_covers_lookahead():
+    window = month_window("2024-02", "2024-06-01T00:00:00+00:00")
+
+    assert window["month_end"].isoformat() == "2024-03-01T00:00:00"
+    assert (window["lookahead_end"] - window["month_end"]).days > 32
+    assert window["observation_cutoff"].tzinfo is None
+
+
+def test_partitions_match_monolithic_build(backend):
+    build_all(backend)
+
+    with duckdb.connect(backend.database, read_only=True) as con:
+        partitioned = con.execute("SELECT * FROM agg_input_table").fetchall()
+        monolithic = con.execute(MONOLITHIC_QUERY).fetchall()
+
+    assert len(partitioned) > 0
+    assert partitioned == monolithic
+
+
+def test_fingerprint_tracks_partition_contents(backend):
+    months, observation_cutoff = build_all(backend)
+    before = {month: backend.fingerprint(month, observation_cutoff) for month in months}
+
+    assert backend.stored_row_counts() == {m: fp["n_rows"] for m, fp in before.items()}
+    assert before == {month: backend.fingerprint(month, observation_cutoff) for month in months}
+
+    # A new user's first payment only touches the partition of its month
+    target = months[2]
+    with duckdb.connect(backend.database) as con:
+        con.execute(
+            "INSERT INTO monthly_payments VALUES (100000, ?)",
+            [month_window(target, observation_cutoff)["month_start"]],
+        )
+    after = {month: backend.fingerprint(month, observation_cutoff) for month in months}
+
+    changed = [month for month in months if after[month] != before[month]]
+    assert changed == [target]
+    assert after[target]["n_rows"] == before[target]["n_rows"] + 1
+
+
+def test_truncated_partition_is_rebuilt(backend):
+    months, observation_cutoff = build_all(backend)
+    month = months[1]
+    fingerprint = backend.fingerprint(month, observation_cutoff)
+
+    assert partition_is_current(backend, month, fingerprint, fingerprint)
+    assert not partition_is_current(backend, month, fingerprint, None)
+
+    # Truncated outside the pipeline: same source rows, fewer stored rows
+    path = backend.partition_path(month)
+    duckdb.sql(
+        f"COPY (SELECT * FROM read_parquet('{path}') LIMIT 1) TO '{path}.tmp' (FORMAT parquet)"
+    )
+    path.with_name(path.name + ".tmp").replace(path)
+
+    assert not partition_is_current(backend, month, fingerprint, fingerprint)
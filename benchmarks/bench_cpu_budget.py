@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark Optuna/XGBoost tuning throughput with and without CPU budgeting.
+
+Inside a CPU quota, XGBoost's default ``nthread`` is the host's core count, so
+the unbudgeted configuration uses ``--host-threads`` threads per trial; the
+budgeted one uses the per-trial share of the quota from ``detect_cpu_budget``.
+Both run the same trials with the same number of concurrent workers and fixed
+boosting rounds. Configurations are interleaved over ``--repeats`` rounds and
+reported as mean +/- standard deviation, with differences smaller than twice
+their standard error flagged as noise.
+
+Run it inside a real CFS quota, the way the trainer runs on Vertex AI:
+
+    docker run --rm --cpus=4 -v "$PWD":/app -w /app <trainer image> \\
+        python benchmarks/bench_cpu_budget.py --trial-workers 2
+    systemd-run --user --scope -p CPUQuota=400% \\
+        uv run python benchmarks/bench_cpu_budget.py --trial-workers 2
+
+Outside a container the quota is read from the cgroup mounted at
+``--cgroup-root``. ``--quota N`` instead simulates a quota by pinning the
+process to N CPUs: this caps parallelism but does not reproduce CFS
+throttling, so oversubscription costs less than under a real quota.
+
+Usage:
+    uv run python benchmarks/bench_cpu_budget.py [--trial-workers 2] [--repeats 5]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import optuna
+import xgboost as xgb
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "trainer"))
+
+from resources import CGROUP_ROOT, cgroup_cpu_quota, detect_cpu_budget  # noqa: E402
+from validation import ResourcesConfig  # noqa: E402
+
+
+def make_dmatrix(n_rows, seed=0):
+    """Synthetic churn-like training data."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 9)).astype(np.float32)
+    y = (X[:, 0] - X[:, 1] + rng.normal(size=n_rows) > 1.0).astype(int)
+    return xgb.DMatrix(X, label=y)
+
+
+def run_trials(dtrain, n_trials, trial_workers, nthread, rounds):
+    """Wall time of ``n_trials`` Optuna trials run ``trial_workers`` at a time."""
+
+    def objective(trial):
+        params = {
+            "objective": "binary:logistic",
+            "tree_method": "hist",
+            "nthread": nthread,
+            "max_depth": trial.suggest_int("max_depth", 3, 8),
+            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+        }
+        xgb.train(params, dtrain, num_boost_round=rounds)
+        return 0.0
+
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=0))
+    start = time.perf_counter()
+    study.optimize(objective, n_trials=n_trials, n_jobs=trial_workers)
+    return time.perf_counter() - start
+
+
+def simulated_budget(quota, trial_workers):
+    """Budget for a fake ``cpu.max`` quota, enforced by CPU affinity."""
+    with tempfile.TemporaryDirectory() as cgroup_root:
+        Path(cgroup_root, "cpu.max").write_text(f"{int(quota * 100000)} 100000\n")
+        budget = detect_cpu_budget(
+            ResourcesConfig(cgroup_root=cgroup_root, trial_workers=trial_workers)
+        )
+    if hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))[: budget.cpus]
+        os.sched_setaffinity(0, cpus)
+        print(f"Simulated quota: pinned to CPUs {cpus} (no CFS throttling)")
+    return budget
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cgroup-root", default=CGROUP_ROOT)
+    parser.add_argument("--quota", type=float, help="Simulate a quota with CPU affinity")
+    parser.add_argument("--host-threads", type=int, default=os.cpu_count())
+    parser.add_argument("--trial-workers", type=int, default=2)
+    parser.add_argument("--trials", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    if args.quota is not None:
+        budget = simulated_budget(args.quota, args.trial_workers)
+        quota = args.quota
+    else:
+        quota = cgroup_cpu_quota(args.cgroup_root)
+        if quota is None:
+            print(f"No CPU quota found under {args.cgroup_root}; nothing is throttled")
+        budget = detect_cpu_budget(
+            ResourcesConfig(cgroup_root=args.cgroup_root, trial_workers=args.trial_workers)
+        )
+
+    dtrain = make_dmatrix(args.rows)
+    configs = [
+        ("unbudgeted", budget.trial_workers, args.host_threads),
+        ("budgeted", budget.trial_workers, budget.xgb_threads),
+    ]
+    print(
+        f"Quota: {quota} CPUs, budget: {budget.cpus} CPUs, host threads: {args.host_threads}, "
+        f"trials: {args.trials}, repeats: {args.repeats}"
+    )
+
+    run_trials(dtrain, 1, 1, budget.xgb_threads, args.rounds)  # warm-up
+    seconds = {name: [] for name, _, _ in configs}
+    for repeat in range(args.repeats):
+        # Alternate the order so drift (thermal, noisy neighbours) hits both equally
+        for name, workers, nthread in configs if repeat % 2 == 0 else configs[::-1]:
+            seconds[name].append(run_trials(dtrain, args.trials, workers, nthread, args.rounds))
+
+    print(f"{'config':>11} {'workers':>8} {'nthread':>8} {'seconds':>15} {'trials/min':>11}")
+    for name, workers, nthread in configs:
+        runs = np.array(seconds[name])
+        print(
+            f"{name:>11} {workers:>8} {nthread:>8} "
+            f"{runs.mean():>7.2f} +/- {runs.std(ddof=1):<5.2f} "
+            f"{args.trials * 60 / runs.mean():>11.1f}"
+        )
+
+    unbudgeted, budgeted = (np.array(seconds[name]) for name, _, _ in configs)
+    diff = unbudgeted.mean() - budgeted.mean()
+    stderr = math.sqrt((unbudgeted.var(ddof=1) + budgeted.var(ddof=1)) / args.repeats)
+    verdict = "within noise" if abs(diff) < 2 * stderr else "significant"
+    print(
+        f"Speedup: {unbudgeted.mean() / budgeted.mean():.2f}x "
+        f"(difference {diff:.2f}s, standard error {stderr:.2f}s: {verdict})"
+    )
+
+
+if __name__ == "__main__":
+    main()
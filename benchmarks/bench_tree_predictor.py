@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark CompiledTreePredictor against native XGBoost prediction by batch size.
+
+Trains a churn-like model (numeric + categorical features, early stopping) and
+reports the median latency per call for:
+
+- native:  DMatrix construction + Booster.predict (what evaluate_model does)
+- inplace: Booster.inplace_predict (no DMatrix)
+- numpy:   CompiledTreePredictor.predict
+
+Usage:
+    uv run python benchmarks/bench_tree_predictor.py [--max-depth 6] [--repeats 50]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "trainer"))
+
+from tree_predictor import CompiledTreePredictor  # noqa: E402
+
+FEATURE_TYPES = ["q"] * 6 + ["c"] * 3
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def make_data(n_rows, seed=0):
+    """Synthetic rows shaped like agg_input_table features."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack(
+        [
+            rng.normal(size=(n_rows, 5)),
+            rng.integers(0, 36, size=n_rows),
+            rng.integers(0, 12, size=n_rows),
+            rng.integers(0, 12, size=n_rows),
+            rng.integers(0, 2, size=n_rows),
+        ]
+    ).astype(np.float32)
+    logit = X[:, 0] - X[:, 1] + 0.3 * X[:, 5] / 12 + np.isin(X[:, 6], [0, 11]) - X[:, 8]
+    y = (logit + rng.normal(size=n_rows) > 0.5).astype(int)
+    return X, y
+
+
+def median_seconds(fn, repeats):
+    """Median wall time of ``repeats`` calls after one warm-up call."""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    X, y = make_data(50000)
+    dtrain = xgb.DMatrix(
+        X[:40000], label=y[:40000], feature_types=FEATURE_TYPES, enable_categorical=True
+    )
+    dval = xgb.DMatrix(
+        X[40000:], label=y[40000:], feature_types=FEATURE_TYPES, enable_categorical=True
+    )
+    booster = xgb.train(
+        {
+            "objective": "binary:logistic",
+            "eval_metric": "aucpr",
+            "tree_method": "hist",
+            "max_cat_to_onehot": 4,
+            "max_depth": args.max_depth,
+            "learning_rate": 0.05,
+        },
+        dtrain,
+        num_boost_round=args.rounds,
+        evals=[(dval, "val")],
+        early_stopping_rounds=50,
+        verbose_eval=False,
+    )
+    best_it = booster.best_iteration
+    iteration_range = (0, best_it + 1)
+    predictor = CompiledTreePredictor.from_booster(booster, best_it)
+    print(f"Trees: {predictor.n_trees}, max depth: {predictor.max_depth}")
+
+    X_score, _ = make_data(max(BATCH_SIZES), seed=1)
+    print(
+        f"{'batch':>7} {'native ms':>10} {'inplace ms':>11} {'numpy ms':>9} {'speedup':>8} {'max |diff|':>11}"
+    )
+    for batch in BATCH_SIZES:
+        rows = X_score[:batch]
+
+        def native():
+            dmatrix = xgb.DMatrix(rows, feature_types=FEATURE_TYPES, enable_categorical=True)
+            return booster.predict(dmatrix, iteration_range=iteration_range)
+
+        def inplace():
+            return booster.inplace_predict(rows, iteration_range=iteration_range)
+
+        def compiled():
+            return predictor.predict(rows)
+
+        repeats = args.repeats if batch <= 1000 else max(3, args.repeats // 10)
+        t_native = median_seconds(native, repeats)
+        t_inplace = median_seconds(inplace, repeats)
+        t_numpy = median_seconds(compiled, repeats)
+        diff = np.abs(native() - compiled()).max()
+        print(
+            f"{batch:>7} {t_native * 1e3:>10.3f} {t_inplace * 1e3:>11.3f} {t_numpy * 1e3:>9.3f} "
+            f"{t_native / t_numpy:>7.1f}x {diff:>11.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,21 @@ CONTAINER_IMAGE = "us-central1-docker.pkg.dev/lily-demo-ml/churn-pipeline/churn-
 @component(base_image=CONTAINER_IMAGE)
 def train_churn_model(
     project_id: str,
+    bucket: str,
     model_output: Output[Model],
     metrics_output: Output[Metrics],
 ):
+    import os
     import sys
 
+    # The container's filesystem is discarded after the run; keep state that later
+    # runs build on in the bucket Vertex AI mounts under /gcs
+    mount = f"/gcs/{bucket}"
+    if not os.path.isdir(mount):
+        raise RuntimeError(f"Bucket {bucket} is not mounted at {mount}")
+    os.environ["CHURN_STUDY_STORAGE"] = f"{mount}/churn/studies/churn.journal"
+    os.environ["CHURN_MODEL_DIR"] = f"{mount}/churn/models"
+
     sys.path.append("/app")
     from trainer.main import main
 
@@ -37,9 +47,9 @@ def train_churn_model(
 
 
 @dsl.pipeline(name="churn-prediction-pipeline")
-def churn_pipeline(project_id: str = "lily-demo-ml"):
+def churn_pipeline(project_id: str = "lily-demo-ml", bucket: str = "lily-demo-ml-pipeline"):
     """Churn prediction pipeline."""
-    train_task = train_churn_model(project_id=project_id)
+    train_task = train_churn_model(project_id=project_id, bucket=bucket)
     train_task.set_cpu_limit("4")
     train_task.set_memory_limit("16G")
 
@@ -62,7 +72,7 @@ def deploy(project_id: str, region: str = "us-central1", bucket: str = None):
         display_name="churn-prediction",
         template_path="churn_demo_pipeline.json",
         pipeline_root=f"gs://{bucket}/churn",
-        parameter_values={"project_id": project_id},
+        parameter_values={"project_id": project_id, "bucket": bucket},
         enable_caching=False,
     )
 
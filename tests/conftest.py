@@ -0,0 +1,32 @@
+"""Shared test fixtures."""
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from trainer.model_bundle import ModelBundle
+
+
+@pytest.fixture
+def make_bundle():
+    """Factory of small bundles trained on random numeric features ``f_0``, ``f_1``, ..."""
+
+    def make(name="churn", version=1, n_rounds=5, n_features=2, bundle_cls=ModelBundle):
+        """Train a small bundle; more rounds give different predictions."""
+        rng = np.random.default_rng(version)
+        X = rng.normal(size=(300, n_features)).astype(np.float32)
+        y = (X[:, 0] + X[:, 1] > 0).astype(int)
+        feature_cols = [f"f_{i}" for i in range(n_features)]
+        booster = xgb.train(
+            {"objective": "binary:logistic", "max_depth": 2},
+            xgb.DMatrix(X, label=y, feature_names=feature_cols),
+            num_boost_round=n_rounds,
+        )
+        return bundle_cls(
+            booster=booster,
+            feature_cols=feature_cols,
+            feature_types=["q"] * n_features,
+            name=name,
+            version=version,
+        )
+
+    return make
@@ -3,7 +3,7 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from trainer.data_preprocessing import compute_scale_pos_weight, time_ordered_split
+from trainer.data_preprocessing import compute_scale_pos_weight, split_masks, time_ordered_split
 
 
 @pytest.fixture
@@ -50,6 +50,19 @@ def test_time_ordered_split_fractions(sample_data):
     assert X_test.shape[0] / total < 0.25  # ~20%
 
 
+def test_split_masks_align_with_split(sample_data):
+    """Test row masks select the same rows, in order, as time_ordered_split."""
+    _, y_train, _, y_val, _, y_test = time_ordered_split(
+        sample_data, test_frac=0.2, val_frac=0.1, feature_cols=["payment_date"]
+    )
+    train_mask, val_mask, test_mask = split_masks(sample_data, test_frac=0.2, val_frac=0.1)
+
+    assert not (train_mask & val_mask).any() and not (val_mask & test_mask).any()
+    np.testing.assert_array_equal(sample_data["is_churn"].values[train_mask], y_train)
+    np.testing.assert_array_equal(sample_data["is_churn"].values[val_mask], y_val)
+    np.testing.assert_array_equal(sample_data["is_churn"].values[test_mask], y_test)
+
+
 def test_compute_scale_pos_weight():
     """Test scale_pos_weight calculation."""
     y = np.array([0, 0, 0, 0, 1])  # 20% positive class
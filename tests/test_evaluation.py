@@ -1,7 +1,9 @@
 """Tests for model evaluation metrics."""
 import numpy as np
+import xgboost as xgb
 
-from trainer.model_evaluation import precision_at_k
+from trainer.model_evaluation import evaluate_model, precision_at_k
+from trainer.permutation_importance import permutation_importance
 
 
 def test_precision_at_k_perfect():
@@ -38,3 +40,18 @@ def test_precision_at_k_bounds():
 
     precision = precision_at_k(y_true, y_score, k=0.05)
     assert 0.0 <= precision <= 1.0
+
+
+def test_evaluate_model_honours_best_iteration_zero():
+    """Test best_iteration 0 scores the first tree only, like permutation importance does."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1000, 2)).astype(np.float32)
+    y = (X[:, 0] + rng.normal(size=1000) > 1).astype(int)
+    dmatrix = xgb.DMatrix(X, label=y, feature_names=["f_0", "f_1"])
+    model = xgb.train({"objective": "binary:logistic", "max_depth": 2}, dmatrix, 10)
+    model.best_iteration = 0
+
+    metrics = evaluate_model(model, dmatrix, dmatrix, y, y)
+    importance = permutation_importance(model, X, y, ["f_0", "f_1"], n_repeats=1, n_workers=1)
+
+    assert metrics["pr_auc_val"] == importance.attrs["baseline_pr_auc"]
@@ -0,0 +1,64 @@
+"""Tests for multi-fidelity training subsamples."""
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from trainer.fidelity import build_fidelity_levels, fidelity_fractions, user_stratified_subsample
+
+
+@pytest.fixture
+def training_rows():
+    """Rows of 1000 users, 12 months each; 10% of users churn in their last row."""
+    rng = np.random.default_rng(3)
+    user_ids = np.repeat(np.arange(1000), 12)
+    y = np.zeros(len(user_ids))
+    churners = rng.choice(1000, size=100, replace=False)
+    y[churners * 12 + 11] = 1
+    return user_ids, y
+
+
+def test_fidelity_fractions():
+    """Test fractions grow geometrically up to the full data."""
+    assert fidelity_fractions(3, 3) == pytest.approx([1 / 9, 1 / 3, 1.0])
+    assert fidelity_fractions(2, 2) == pytest.approx([0.5, 1.0])
+
+
+def test_subsample_keeps_positives_and_whole_users(training_rows):
+    """Test every positive row is kept and sampled users keep all their rows."""
+    user_ids, y = training_rows
+    rows = user_stratified_subsample(user_ids, y, fraction=0.2, seed=0)
+
+    assert set(np.flatnonzero(y == 1)) <= set(rows)
+    negative_users = np.unique(user_ids[rows][y[rows] == 0])
+    assert len(negative_users) == pytest.approx(200, abs=1)
+    counts = np.bincount(user_ids[rows], minlength=1000)
+    assert set(counts[negative_users]) == {12}
+
+
+def test_subsamples_are_nested(training_rows):
+    """Test a smaller fraction draws a subset of the users of a larger one."""
+    user_ids, y = training_rows
+    small = user_stratified_subsample(user_ids, y, fraction=0.1, seed=5)
+    large = user_stratified_subsample(user_ids, y, fraction=0.3, seed=5)
+
+    assert set(small) < set(large)
+
+
+def test_levels_correct_scale_pos_weight(training_rows):
+    """Test level scale_pos_weight matches the downsampled class ratio."""
+    user_ids, y = training_rows
+    dtrain = xgb.DMatrix(np.zeros((len(y), 1)), label=y)
+    full_spw = (y == 0).sum() / (y == 1).sum()
+
+    levels = build_fidelity_levels(
+        dtrain, user_ids, full_spw, reduction_factor=3, n_rungs=3, seed=0
+    )
+
+    assert [level.step for level in levels] == [1, 3, 9]
+    assert levels[-1].dtrain is dtrain
+    assert levels[-1].scale_pos_weight == pytest.approx(full_spw)
+    for level in levels[:-1]:
+        level_y = level.dtrain.get_label()
+        assert level_y.sum() == y.sum()
+        assert level.scale_pos_weight == pytest.approx((level_y == 0).sum() / (level_y == 1).sum())
+        assert level.scale_pos_weight < full_spw
@@ -0,0 +1,141 @@
+"""Tests for incremental retraining."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from trainer.incremental import (
+    full_retrain_reason,
+    incremental_retrain,
+    population_stability_index,
+    recency_weights,
+)
+from trainer.model_bundle import ModelBundle
+from trainer.validation import IncrementalConfig
+
+TRAINER_DIR = Path(__file__).resolve().parents[1] / "trainer"
+# Feature columns and types of the bundles built by make_previous
+SCHEMA = (["f_0", "f_1"], ["q", "q"])
+
+
+@pytest.fixture
+def payments():
+    """Monthly payments over a year with a feature that is stable over time."""
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-15", periods=12, freq="MS", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "payment_date": np.repeat(dates, 100),
+            "f_0": rng.normal(size=1200),
+            "f_1": rng.normal(size=1200),
+        }
+    )
+    df["is_churn"] = (df["f_0"] + rng.normal(scale=0.5, size=1200) > 1).astype(int)
+    return df
+
+
+def make_previous(df, data_end, **metadata):
+    """Bundle of a model trained on rows up to data_end."""
+    old = df[df["payment_date"] <= data_end]
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 2},
+        xgb.DMatrix(old[["f_0", "f_1"]], label=old["is_churn"]),
+        num_boost_round=10,
+    )
+    return ModelBundle(
+        booster=booster,
+        feature_cols=["f_0", "f_1"],
+        feature_types=["q", "q"],
+        best_iteration=9,
+        metadata={"data_end": data_end.isoformat(), "best_params": {"max_depth": 2}, **metadata},
+    )
+
+
+def test_population_stability_index():
+    """Test PSI is ~0 for the same distribution and large for a shifted one."""
+    rng = np.random.default_rng(1)
+    reference = rng.normal(size=5000)
+
+    assert population_stability_index(reference, rng.normal(size=5000)) < 0.02
+    assert population_stability_index(reference, rng.normal(loc=1.0, size=5000)) > 0.2
+
+
+def test_recency_weights():
+    """Test weights halve every half-life and are zero outside the window."""
+    dates = pd.to_datetime(["2024-12-31", "2024-06-30", "2023-06-30"], utc=True)
+    weights = recency_weights(dates, "2024-12-31", half_life_months=6, window_months=12)
+
+    assert weights[0] == 1.0
+    assert weights[1] == pytest.approx(0.5, abs=0.01)
+    assert weights[2] == 0.0
+    np.testing.assert_array_equal(recency_weights(dates, "2024-12-31", None), [1, 1, 1])
+
+
+def test_full_retrain_reasons(payments):
+    """Test each fallback condition is detected."""
+    data_end = pd.Timestamp("2024-11-30", tz="UTC")
+    config = IncrementalConfig(max_consecutive_runs=2, max_pr_auc_drop=0.05)
+    # The recorded PR-AUC is from another validation population and is not compared
+    previous = make_previous(payments, data_end, metrics={"pr_auc_val": 0.99})
+
+    assert full_retrain_reason(previous, payments, *SCHEMA, ["f_0"], config) is None
+
+    previous.metadata["incremental_runs"] = 2
+    assert "consecutive" in full_retrain_reason(previous, payments, *SCHEMA, ["f_0"], config)
+
+    previous.metadata["incremental_runs"] = 0
+    drifted = payments.copy()
+    drifted.loc[drifted["payment_date"] > data_end, "f_0"] += 3
+    assert "drift" in full_retrain_reason(previous, drifted, *SCHEMA, ["f_0"], config)
+
+    previous.metadata["data_end"] = payments["payment_date"].max().isoformat()
+    assert "no new rows" in full_retrain_reason(previous, payments, *SCHEMA, ["f_0"], config)
+
+
+def test_feature_set_change_forces_full_retrain(payments, monkeypatch):
+    """Test added, dropped or retyped columns fall back instead of failing in xgb.train."""
+    config = IncrementalConfig()
+    previous = make_previous(payments, pd.Timestamp("2024-11-30", tz="UTC"))
+
+    added = full_retrain_reason(
+        previous, payments, ["f_0", "f_1", "f_2"], ["q", "q", "q"], ["f_0"], config
+    )
+    assert "feature set changed" in added and "'f_2'" in added
+    dropped = full_retrain_reason(previous, payments, ["f_0"], ["q"], ["f_0"], config)
+    assert "feature set changed" in dropped and "'f_1'" in dropped
+    retyped = full_retrain_reason(previous, payments, ["f_0", "f_1"], ["q", "c"], ["f_0"], config)
+    assert retyped == "feature types changed"
+
+    monkeypatch.chdir(TRAINER_DIR)
+    payments["f_2"] = 0.0
+    X = payments[["f_0", "f_1", "f_2"]].values
+    y = payments["is_churn"].values
+    dtrain = xgb.DMatrix(X, label=y, feature_names=["f_0", "f_1", "f_2"])
+    model, reason = incremental_retrain(
+        previous, payments, np.ones(len(y), bool), dtrain, dtrain, y, ["f_0"], config
+    )
+
+    assert model is None
+    assert "feature set changed" in reason
+
+
+def test_incremental_retrain_appends_trees(payments, monkeypatch):
+    """Test the previous booster is continued on windowed rows instead of retrained."""
+    monkeypatch.chdir(TRAINER_DIR)  # train_final_model reads config.yaml
+    previous = make_previous(payments, pd.Timestamp("2024-11-30", tz="UTC"))
+    X = payments[["f_0", "f_1"]].values
+    y = payments["is_churn"].values
+    train_mask = np.arange(len(payments)) % 5 != 0
+    dtrain = xgb.DMatrix(X[train_mask], label=y[train_mask], feature_names=["f_0", "f_1"])
+    dval = xgb.DMatrix(X[~train_mask], label=y[~train_mask], feature_names=["f_0", "f_1"])
+    config = IncrementalConfig(num_boost_round=5, window_months=6, max_pr_auc_drop=1.0)
+
+    model, reason = incremental_retrain(
+        previous, payments, train_mask, dtrain, dval, y[~train_mask], ["f_0"], config
+    )
+
+    assert reason is None
+    assert previous.booster.num_boosted_rounds() == 10
+    assert 10 < model.num_boosted_rounds() <= 15
@@ -0,0 +1,92 @@
+"""Tests for model bundle save/load."""
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from trainer.model_bundle import (
+    ModelBundle,
+    latest_bundle_version,
+    list_bundle_versions,
+    load_model_bundle,
+    save_model_bundle,
+)
+
+FEATURE_COLS = ["f_0", "f_1", "calendar_month"]
+FEATURE_TYPES = ["q", "q", "c"]
+
+
+@pytest.fixture
+def bundle():
+    """Train a small booster with a categorical feature and wrap it in a bundle."""
+    rng = np.random.default_rng(42)
+    X = np.column_stack(
+        [rng.normal(size=300), rng.normal(size=300), rng.integers(0, 12, size=300)]
+    ).astype(np.float32)
+    y = ((X[:, 0] + (X[:, 2] % 3 == 0)) > 0.5).astype(int)
+    dtrain = xgb.DMatrix(
+        X, label=y, feature_names=FEATURE_COLS, feature_types=FEATURE_TYPES, enable_categorical=True
+    )
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 3, "tree_method": "hist"},
+        dtrain,
+        num_boost_round=20,
+        evals=[(dtrain, "train")],
+        early_stopping_rounds=5,
+        verbose_eval=False,
+    )
+    return ModelBundle(
+        booster=booster,
+        feature_cols=FEATURE_COLS,
+        feature_types=FEATURE_TYPES,
+        categorical_encodings={"calendar_month": list(range(1, 13))},
+        best_iteration=booster.best_iteration,
+        metadata={"scale_pos_weight": np.float64(2.5), "data_end": pd.Timestamp("2024-01-31")},
+    )
+
+
+def test_bundle_roundtrip(bundle, tmp_path):
+    """Test a saved bundle loads with identical context and predictions."""
+    path = save_model_bundle(bundle, tmp_path)
+    loaded = load_model_bundle(path)
+
+    assert loaded.feature_cols == FEATURE_COLS
+    assert loaded.feature_types == FEATURE_TYPES
+    assert loaded.categorical_encodings == bundle.categorical_encodings
+    assert loaded.best_iteration == bundle.best_iteration
+    assert loaded.metadata["scale_pos_weight"] == 2.5
+    assert loaded.metadata["data_end"] == "2024-01-31T00:00:00"
+
+    X = np.array([[0.1, -1.0, 3], [2.0, 0.5, 7]], dtype=np.float32)
+    np.testing.assert_allclose(loaded.predict(X), bundle.predict(X))
+
+
+def test_bundle_encodes_raw_frames(bundle):
+    """Test raw categorical levels are mapped to training codes and unseen levels to missing."""
+    df = pd.DataFrame({"f_0": [0.1, 0.2], "f_1": [1.0, 2.0], "calendar_month": [4, 99]})
+    X = bundle.encode(df)
+
+    assert X.dtype == np.float32
+    assert X[0, 2] == 3  # month 4 is the fourth level
+    assert np.isnan(X[1, 2])
+
+
+def test_bundle_versions(bundle, tmp_path):
+    """Test version discovery ignores other models and unrelated files."""
+    for version in (1, 3, 2):
+        bundle.version = version
+        save_model_bundle(bundle, tmp_path)
+    (tmp_path / "other-v9.xgbundle").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("")
+
+    assert list_bundle_versions(tmp_path, "churn") == [1, 2, 3]
+    assert latest_bundle_version(tmp_path, "churn") == 3
+    assert latest_bundle_version(tmp_path / "missing", "churn") is None
+
+
+def test_load_rejects_foreign_files(tmp_path):
+    """Test loading a non-bundle file raises ValueError."""
+    path = tmp_path / "churn-v1.xgbundle"
+    path.write_bytes(b"not a bundle at all, just bytes")
+    with pytest.raises(ValueError):
+        load_model_bundle(path)
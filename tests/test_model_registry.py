@@ -0,0 +1,51 @@
+"""Tests for the in-process model registry."""
+import numpy as np
+import pytest
+
+from trainer.model_bundle import save_model_bundle
+from trainer.model_registry import ModelRegistry
+
+
+def test_registry_loads_latest_version(tmp_path, make_bundle):
+    """Test get returns the newest bundle on disk."""
+    save_model_bundle(make_bundle("churn", 1), tmp_path)
+    save_model_bundle(make_bundle("churn", 2), tmp_path)
+
+    registry = ModelRegistry(tmp_path)
+    assert registry.get("churn").version == 2
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing")
+
+
+def test_registry_evicts_least_recently_used(tmp_path, make_bundle):
+    """Test the registry keeps at most `capacity` models, evicting the LRU one."""
+    for name in ("a", "b", "c"):
+        save_model_bundle(make_bundle(name, 1), tmp_path)
+
+    registry = ModelRegistry(tmp_path, capacity=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # "b" is now least recently used
+    registry.get("c")
+
+    assert len(registry) == 2
+    assert "a" in registry and "c" in registry
+    assert "b" not in registry
+
+
+def test_registry_hot_swaps_new_versions(tmp_path, make_bundle):
+    """Test refresh swaps in a newer version while held bundles keep working."""
+    save_model_bundle(make_bundle("churn", 1), tmp_path)
+    registry = ModelRegistry(tmp_path)
+    in_flight = registry.get("churn")
+
+    assert registry.refresh() == {}
+
+    save_model_bundle(make_bundle("churn", 2, n_rounds=10), tmp_path)
+    assert registry.refresh() == {"churn": 2}
+    assert registry.get("churn").version == 2
+
+    X = np.zeros((3, 2), dtype=np.float32)
+    assert in_flight.version == 1
+    assert in_flight.predict(X).shape == (3,)
@@ -0,0 +1,98 @@
+"""Tests for container-aware CPU budgeting."""
+import os
+
+import pytest
+
+from trainer.resources import (
+    THREAD_ENV_VARS,
+    apply_cpu_budget,
+    available_cpus,
+    cgroup_cpu_quota,
+    cgroup_memory_limit,
+    plan_cpu_budget,
+)
+
+
+def write_files(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content + "\n")
+    return root
+
+
+def test_cgroup_v2_limits(tmp_path):
+    """Test cpu.max and memory.max are parsed, 'max' meaning unlimited."""
+    root = write_files(tmp_path, {"cpu.max": "250000 100000", "memory.max": "17179869184"})
+    assert cgroup_cpu_quota(root) == 2.5
+    assert cgroup_memory_limit(root) == 16 * 2**30
+
+    write_files(tmp_path, {"cpu.max": "max 100000", "memory.max": "max"})
+    assert cgroup_cpu_quota(root) is None
+    assert cgroup_memory_limit(root) is None
+
+
+def test_cgroup_v1_limits(tmp_path):
+    """Test CFS quota/period and memory.limit_in_bytes, -1 and huge values meaning unlimited."""
+    root = write_files(
+        tmp_path,
+        {
+            "cpu,cpuacct/cpu.cfs_quota_us": "400000",
+            "cpu,cpuacct/cpu.cfs_period_us": "100000",
+            "memory/memory.limit_in_bytes": "4294967296",
+        },
+    )
+    assert cgroup_cpu_quota(root) == 4.0
+    assert cgroup_memory_limit(root) == 4 * 2**30
+
+    write_files(
+        tmp_path,
+        {
+            "cpu,cpuacct/cpu.cfs_quota_us": "-1",
+            "memory/memory.limit_in_bytes": "9223372036854771712",
+        },
+    )
+    assert cgroup_cpu_quota(root) is None
+    assert cgroup_memory_limit(root) is None
+    assert cgroup_cpu_quota(tmp_path / "missing") is None
+
+
+def test_available_cpus_respects_quota(tmp_path):
+    """Test a fractional quota rounds down but never below one CPU."""
+    host_cpus = len(os.sched_getaffinity(0))
+    write_files(tmp_path, {"cpu.max": "50000 100000"})
+    assert available_cpus(tmp_path) == 1
+
+    write_files(tmp_path, {"cpu.max": f"{(host_cpus + 8) * 100000} 100000"})
+    assert available_cpus(tmp_path) == host_cpus
+
+
+@pytest.mark.parametrize(
+    "cpus, workers, memory_limit, memory_per_trial, expected",
+    [
+        (4, 1, None, None, (1, 4)),
+        (4, 2, None, None, (2, 2)),
+        (4, 8, None, None, (4, 1)),
+        (6, 4, None, None, (4, 1)),
+        (8, 4, 3 * 2**30, 2**30, (3, 2)),
+        (8, 4, 2**29, 2**30, (1, 8)),
+    ],
+)
+def test_plan_cpu_budget(cpus, workers, memory_limit, memory_per_trial, expected):
+    """Test trials are capped by CPUs and memory and threads never oversubscribe."""
+    budget = plan_cpu_budget(cpus, memory_limit, workers, memory_per_trial)
+
+    assert (budget.trial_workers, budget.xgb_threads) == expected
+    assert budget.trial_workers * budget.xgb_threads <= cpus
+    assert budget.blas_threads == budget.xgb_threads
+
+
+def test_apply_cpu_budget_sets_thread_env(monkeypatch):
+    """Test OpenMP/BLAS environment variables are set for child processes."""
+    monkeypatch.setattr(os, "environ", {})
+
+    limiter = apply_cpu_budget(plan_cpu_budget(4, trial_workers=2))
+    try:
+        assert os.environ == {name: "2" for name in THREAD_ENV_VARS}
+    finally:
+        limiter.restore_original_limits()
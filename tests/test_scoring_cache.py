@@ -0,0 +1,84 @@
+"""Tests for the change-aware scoring cache."""
+import numpy as np
+import pytest
+
+from trainer.model_bundle import ModelBundle
+from trainer.scoring_cache import ScoringCache, hash_rows
+
+
+class CountingBundle(ModelBundle):
+    """Bundle that records how many rows reach the booster."""
+
+    scored_rows = 0
+
+    def predict(self, X):
+        self.scored_rows += len(X)
+        return super().predict(X)
+
+
+@pytest.fixture
+def make_counting_bundle(make_bundle):
+    """Bundles over features f_0..f_2 that count the rows they score."""
+
+    def make(version=1):
+        return make_bundle(version=version, n_features=3, bundle_cls=CountingBundle)
+
+    return make
+
+
+def test_hash_rows_is_sensitive_to_values_and_seed():
+    """Test one flipped bit or another seed changes the hash, -0.0/NaN payloads do not."""
+    X = np.random.default_rng(1).normal(size=(1000, 5)).astype(np.float32)
+    changed = X.copy()
+    changed[7, 4] = np.nextafter(changed[7, 4], np.float32(np.inf))
+
+    keys = hash_rows(X, seed=1)
+    assert len(np.unique(keys)) == len(X)
+    assert np.flatnonzero(hash_rows(changed, seed=1) != keys).tolist() == [7]
+    assert not np.any(hash_rows(X, seed=2) == keys)
+
+    quiet_nan = np.array([[-0.0, np.nan]], dtype=np.float32)
+    other_nan = np.array([[0.0, 0.0]], dtype=np.float32)
+    other_nan.view(np.uint32)[0, 1] = 0x7FC00001
+    assert hash_rows(quiet_nan) == hash_rows(other_nan)
+
+
+def test_only_new_or_changed_rows_are_scored(tmp_path, make_counting_bundle):
+    """Test cached rows skip the booster and get the same scores as a full prediction."""
+    bundle = make_counting_bundle()
+    X = np.random.default_rng(2).normal(size=(500, 3)).astype(np.float32)
+    cache = ScoringCache(tmp_path)
+
+    first = cache.score(bundle, X)
+    assert bundle.scored_rows == 500
+
+    X[:50, 2] += 1.0
+    # The 10 repeated changed rows are scored once
+    second = cache.score(bundle, np.vstack([X, X[:10]]))
+    assert bundle.scored_rows == 550
+    np.testing.assert_allclose(second[:500], ModelBundle.predict(bundle, X), rtol=1e-6)
+    np.testing.assert_array_equal(second[50:500], first[50:])
+    assert cache.stats.hits == 450
+    assert cache.stats.hit_rate == pytest.approx(450 / 1010)
+
+
+def test_cache_persists_and_evicts_stale_versions(tmp_path, make_counting_bundle):
+    """Test saved versions are reloaded and only the newest `max_versions` are kept."""
+    X = np.random.default_rng(3).normal(size=(100, 3)).astype(np.float32)
+
+    cache = ScoringCache(tmp_path, max_versions=2)
+    for version in (1, 2):
+        cache.score(make_counting_bundle(version), X)
+    cache.save()
+    assert cache.cached_versions("churn") == [1, 2]
+
+    reloaded = ScoringCache(tmp_path, max_versions=2)
+    bundle = make_counting_bundle(2)
+    reloaded.score(bundle, X)
+    assert bundle.scored_rows == 0
+    assert reloaded.stats.hit_rate == 1.0
+
+    reloaded.score(make_counting_bundle(3), X)
+    reloaded.save()
+    assert reloaded.cached_versions("churn") == [2, 3]
+    assert not reloaded.cache_path("churn", 1).exists()
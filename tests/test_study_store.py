@@ -0,0 +1,126 @@
+"""Tests for persistent Optuna study reuse."""
+import optuna
+import pytest
+from optuna.trial import TrialState
+
+from trainer.study_store import (
+    RUN_ID_ATTR,
+    WARM_START_ATTR,
+    RunScopedPruner,
+    best_trial_of_run,
+    enqueue_warm_starts,
+    load_or_create_study,
+    study_fingerprint,
+)
+
+FEATURES = ["f_0", "f_1", "calendar_month"]
+TYPES = ["q", "q", "c"]
+RANGES = {"learning_rate": {"min": 0.01, "max": 0.2, "log": True, "type": "float"}}
+FIXED = {"objective": "binary:logistic", "tree_method": "hist"}
+
+
+def run(study, run_id, n_trials):
+    """Optimize a simple quadratic, tagging trials like tune_hyperparameters does."""
+
+    def objective(trial):
+        trial.set_user_attr(RUN_ID_ATTR, run_id)
+        x = trial.suggest_float("x", -10, 10)
+        return -((x - 2) ** 2)
+
+    study.optimize(objective, n_trials=n_trials)
+
+
+def test_fingerprint_tracks_features_and_search_space():
+    """Test the fingerprint is stable and changes with features or ranges."""
+    base = study_fingerprint(FEATURES, TYPES, RANGES, FIXED)
+
+    assert base == study_fingerprint(FEATURES, TYPES, dict(RANGES), dict(FIXED))
+    assert base != study_fingerprint(FEATURES + ["f_2"], TYPES + ["q"], RANGES, FIXED)
+    assert base != study_fingerprint(FEATURES, ["q", "q", "q"], RANGES, FIXED)
+    wider = {"learning_rate": {**RANGES["learning_rate"], "max": 0.3}}
+    assert base != study_fingerprint(FEATURES, TYPES, wider, FIXED)
+
+
+def test_study_persists_and_warm_starts(tmp_path):
+    """Test a second run sees earlier trials and re-evaluates the best ones first."""
+    storage = str(tmp_path / "studies" / "churn.journal")
+    study = load_or_create_study(storage, "abc", optuna.samplers.TPESampler(seed=0))
+    run(study, "run-1", n_trials=12)
+    previous_best = study.best_params
+
+    study = load_or_create_study(storage, "abc", optuna.samplers.TPESampler(seed=0))
+    assert len(study.trials) == 12
+
+    assert enqueue_warm_starts(study, top_k=3) == 3
+    run(study, "run-2", n_trials=5)
+
+    run_2 = [t for t in study.trials if t.user_attrs.get(RUN_ID_ATTR) == "run-2"]
+    assert len(run_2) == 5
+    assert all(t.user_attrs.get(WARM_START_ATTR) for t in run_2[:3])
+    assert run_2[0].params == previous_best
+
+
+def test_best_trial_of_run_ignores_earlier_runs(tmp_path):
+    """Test only trials of the requested run compete for the best pick."""
+    study = optuna.create_study(direction="maximize")
+    run(study, "old", n_trials=5)
+    study.enqueue_trial({"x": -9.0})
+    run(study, "new", n_trials=1)
+
+    assert best_trial_of_run(study, "new").params == {"x": -9.0}
+    with pytest.raises(ValueError):
+        best_trial_of_run(study, "missing")
+
+
+def run_multi_fidelity(study, run_id, n_trials, offset):
+    """Successive-halving search like tune_hyperparameters, scores shifted by ``offset``."""
+
+    def objective(trial):
+        trial.set_user_attr(RUN_ID_ATTR, run_id)
+        x = trial.suggest_float("x", -10, 10)
+        for step in (1, 3, 9):
+            score = offset - (x - 2) ** 2 - 1 / step
+            if step == 9:
+                return score
+            trial.report(score, step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+    study.optimize(objective, n_trials=n_trials)
+
+
+def test_lower_scoring_run_is_not_pruned_by_earlier_runs(tmp_path):
+    """Test rungs only compete within a run, so a run on harder data still completes."""
+    storage = str(tmp_path / "churn.journal")
+    for run_id, offset in (("run-1", 0.0), ("run-2", -100.0)):
+        pruner = RunScopedPruner(
+            optuna.pruners.SuccessiveHalvingPruner(min_resource=1, reduction_factor=3), run_id
+        )
+        study = load_or_create_study(storage, "abc", optuna.samplers.TPESampler(seed=0), pruner)
+        enqueue_warm_starts(study, top_k=2)
+        run_multi_fidelity(study, run_id, n_trials=10, offset=offset)
+
+    best = best_trial_of_run(study, "run-2")
+    assert best.user_attrs[RUN_ID_ATTR] == "run-2"
+    assert best.state == TrialState.COMPLETE
+    assert best.value < -90
+
+
+def test_best_trial_of_run_falls_back_to_warm_start():
+    """Test a run whose trials were all pruned returns its warm-start configuration."""
+    study = optuna.create_study(direction="maximize")
+    run(study, "old", n_trials=3)
+    enqueue_warm_starts(study, top_k=1)
+
+    def pruned(trial):
+        trial.set_user_attr(RUN_ID_ATTR, "new")
+        x = trial.suggest_float("x", -10, 10)
+        trial.report(-abs(x), 1)
+        raise optuna.TrialPruned()
+
+    study.optimize(pruned, n_trials=3)
+
+    best = best_trial_of_run(study, "new")
+    assert best.state == TrialState.PRUNED
+    assert best.user_attrs[WARM_START_ATTR]
+    assert best.params == study.best_params
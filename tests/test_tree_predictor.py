@@ -0,0 +1,118 @@
+"""Tests for the compiled NumPy tree evaluator."""
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from trainer.tree_predictor import CompiledTreePredictor
+
+FEATURE_TYPES = ["q", "q", "q", "c", "c"]
+
+
+@pytest.fixture(scope="module")
+def churn_like_data():
+    """Synthetic data with numeric, low- and high-cardinality categorical features and NaNs."""
+    rng = np.random.default_rng(7)
+    n = 2000
+    X = np.column_stack(
+        [
+            rng.normal(size=n),
+            rng.exponential(size=n),
+            rng.integers(0, 24, size=n),
+            rng.integers(0, 12, size=n),
+            rng.integers(0, 2, size=n),
+        ]
+    ).astype(np.float32)
+    logit = X[:, 0] - 0.5 * X[:, 1] + np.isin(X[:, 3], [1, 4, 7, 10]) - X[:, 4]
+    y = (logit + rng.normal(scale=0.5, size=n) > 0).astype(int)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X, y
+
+
+def train(X, y, **params):
+    """Train a booster the way train_final_model does, with early stopping."""
+    dtrain = xgb.DMatrix(
+        X[:1500], label=y[:1500], feature_types=FEATURE_TYPES, enable_categorical=True
+    )
+    dval = xgb.DMatrix(
+        X[1500:], label=y[1500:], feature_types=FEATURE_TYPES, enable_categorical=True
+    )
+    return xgb.train(
+        {"objective": "binary:logistic", "tree_method": "hist", "max_cat_to_onehot": 4, **params},
+        dtrain,
+        num_boost_round=200,
+        evals=[(dval, "val")],
+        early_stopping_rounds=10,
+        verbose_eval=False,
+    )
+
+
+def native_predict(booster, X, best_iteration=None):
+    dmatrix = xgb.DMatrix(X, feature_types=FEATURE_TYPES, enable_categorical=True)
+    iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+    return booster.predict(dmatrix, iteration_range=iteration_range)
+
+
+@pytest.mark.parametrize("max_depth", [2, 6])
+def test_matches_booster_predict(churn_like_data, max_depth):
+    """Test compiled predictions agree with Booster.predict, truncated at best_iteration."""
+    X, y = churn_like_data
+    booster = train(X, y, max_depth=max_depth)
+    predictor = CompiledTreePredictor.from_booster(booster, booster.best_iteration)
+
+    assert predictor.n_trees == booster.best_iteration + 1
+    np.testing.assert_allclose(
+        predictor.predict(X), native_predict(booster, X, booster.best_iteration), atol=1e-6
+    )
+
+
+def test_matches_booster_predict_small_batches(churn_like_data):
+    """Test single rows and unseen categories agree with Booster.predict."""
+    X, y = churn_like_data
+    booster = train(X, y, max_depth=4)
+    predictor = CompiledTreePredictor.from_booster(booster)
+
+    np.testing.assert_allclose(predictor.predict(X[0]), native_predict(booster, X[:1]), atol=1e-6)
+
+    unseen = X[:10].copy()
+    unseen[:, 3] = [50, -1, 11, 0, np.nan, 3, 99, 5, 7, 2]
+    np.testing.assert_allclose(
+        predictor.predict(unseen), native_predict(booster, unseen), atol=1e-6
+    )
+
+
+def test_output_margin(churn_like_data):
+    """Test margins agree with Booster.predict(output_margin=True)."""
+    X, y = churn_like_data
+    booster = train(X, y, max_depth=3)
+    predictor = CompiledTreePredictor.from_booster(booster)
+    dmatrix = xgb.DMatrix(X, feature_types=FEATURE_TYPES, enable_categorical=True)
+
+    np.testing.assert_allclose(
+        predictor.predict(X, output_margin=True),
+        booster.predict(dmatrix, output_margin=True),
+        atol=1e-5,
+    )
+
+
+def test_rejects_unsupported_boosters(churn_like_data):
+    """Test multi-class models are rejected."""
+    X, y = churn_like_data
+    booster = xgb.train(
+        {"objective": "multi:softprob", "num_class": 3},
+        xgb.DMatrix(X[:, :3], label=np.arange(len(X)) % 3),
+        num_boost_round=2,
+    )
+    with pytest.raises(ValueError):
+        CompiledTreePredictor.from_booster(booster)
+
+
+def test_rejects_feature_count_mismatch(churn_like_data):
+    """Test too few or too many columns raise instead of reading neighbouring rows."""
+    X, y = churn_like_data
+    booster = xgb.train({"objective": "binary:logistic"}, xgb.DMatrix(X, label=y), 2)
+    predictor = CompiledTreePredictor.from_booster(booster)
+
+    with pytest.raises(ValueError, match="mismatch"):
+        predictor.predict(X[:5, :-1])
+    with pytest.raises(ValueError, match="mismatch"):
+        predictor.predict(np.column_stack([X[:5], X[:5, 0]]))
@@ -0,0 +1,22 @@
+"""Tests for configuration loading."""
+from pathlib import Path
+
+from trainer.validation import load_config
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "trainer" / "config.yaml"
+
+
+def test_env_overrides_persistent_paths(monkeypatch):
+    """Test the pipeline's environment variables replace the relative local paths."""
+    monkeypatch.delenv("CHURN_STUDY_STORAGE", raising=False)
+    monkeypatch.delenv("CHURN_MODEL_DIR", raising=False)
+    config = load_config(CONFIG_PATH)
+    assert config.model.study_storage == "studies/churn.journal"
+    assert config.registry.model_dir == "models"
+
+    monkeypatch.setenv("CHURN_STUDY_STORAGE", "/gcs/bucket/churn/studies/churn.journal")
+    monkeypatch.setenv("CHURN_MODEL_DIR", "/gcs/bucket/churn/models")
+    config = load_config(CONFIG_PATH)
+
+    assert config.model.study_storage == "/gcs/bucket/churn/studies/churn.journal"
+    assert config.registry.model_dir == "/gcs/bucket/churn/models"
@@ -16,11 +16,39 @@ def prepare_data(df, categorical_features=None):
 
     # Combine category conversion and encoding
     if categorical_features is not None:
-        for col in categorical_features:
-            df[col] = df[col].astype("category").cat.codes
+        encode_categoricals(df, categorical_features)
     return df.values
 
 
+def encode_categoricals(df, categorical_features, encodings=None):
+    """
+    Replace categorical columns with integer category codes, in place.
+
+    Missing values stay missing (NaN) so XGBoost routes them along the default
+    branch instead of treating them as a category.
+
+    Args:
+        df: DataFrame holding the categorical columns
+        categorical_features: List of categorical feature names
+        encodings: Existing encodings to keep codes stable with (e.g. those of a
+            model being trained further); levels not seen before get new codes
+
+    Returns:
+        Dictionary mapping each feature to its category levels in code order
+    """
+    encodings = encodings or {}
+    new_encodings = {}
+    for col in categorical_features:
+        levels = list(encodings.get(col, []))
+        known = set(levels)
+        observed = df[col].astype("category").cat.categories.tolist()
+        levels += [level for level in observed if level not in known]
+        codes = pd.Index(levels).get_indexer(df[col])
+        new_encodings[col] = levels
+        df[col] = pd.Series(codes, index=df.index).where(df[col].notna())
+    return new_encodings
+
+
 def time_ordered_split(df, test_frac, val_frac, feature_cols, label_col="is_churn"):
     """
     Split data into train/val/test sets based on user signup date.
@@ -36,10 +64,8 @@ def time_ordered_split(df, test_frac, val_frac, feature_cols, label_col="is_chur
     logger.info("Time-ordered split by user signup date")
 
     # Time-ordered split
-    user_signup = df.groupby("user_id")["payment_date"].min().sort_values()
+    user_signup, val_start, test_start = _split_users(df, test_frac, val_frac)
     n_users = len(user_signup)
-    test_start = int((1.0 - test_frac) * n_users)
-    val_start = int((1.0 - (test_frac + val_frac)) * n_users)
 
     train_users = set(user_signup.iloc[:val_start].index)
     val_users = set(user_signup.iloc[val_start:test_start].index)
@@ -65,6 +91,38 @@ def time_ordered_split(df, test_frac, val_frac, feature_cols, label_col="is_chur
     return X_train, y_train, X_val, y_val, X_test, y_test
 
 
+def split_masks(df, test_frac, val_frac):
+    """
+    Boolean row masks of the time-ordered split.
+
+    Rows selected by each mask are in the same order as the arrays returned by
+    ``time_ordered_split``, so they can be used to pull extra per-row columns
+    (e.g. payment dates for sample weights) aligned with the feature matrices.
+
+    Args:
+        df: DataFrame with user_id and payment_date columns
+        test_frac: Fraction of users for test set
+        val_frac: Fraction of users for validation set
+
+    Returns:
+        Tuple of (train_mask, val_mask, test_mask) boolean arrays
+    """
+    user_signup, val_start, test_start = _split_users(df, test_frac, val_frac)
+    train_mask = df["user_id"].isin(user_signup.index[:val_start]).values
+    val_mask = df["user_id"].isin(user_signup.index[val_start:test_start]).values
+    test_mask = df["user_id"].isin(user_signup.index[test_start:]).values
+    return train_mask, val_mask, test_mask
+
+
+def _split_users(df, test_frac, val_frac):
+    """Users sorted by signup date and the positions where val and test users start."""
+    user_signup = df.groupby("user_id")["payment_date"].min().sort_values()
+    n_users = len(user_signup)
+    test_start = int((1.0 - test_frac) * n_users)
+    val_start = int((1.0 - (test_frac + val_frac)) * n_users)
+    return user_signup, val_start, test_start
+
+
 def compute_scale_pos_weight(y_train):
     """
     Compute scale_pos_weight for handling class imbalance.
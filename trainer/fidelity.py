@@ -0,0 +1,128 @@
+"""
+User-level training subsamples for multi-fidelity hyperparameter tuning.
+
+Early successive-halving rungs train on a fraction of the users. Users are
+sampled within churner / non-churner strata, and every positive row is kept,
+so the subsample mostly drops majority-class rows; the resulting negative
+downsampling is corrected through each level's ``scale_pos_weight``.
+
+With reduction factor r and n rungs, about r^-i of the trials reach rung i,
+which trains on r^-(n-1-i) of the users, so a trial costs n * r^-(n-1) of a
+full-data trial on average: roughly 3x more trials per hour with the defaults
+(r=3, 3 rungs) and ~7x with 4 rungs, at the price of noisier early rungs.
+
+XGBoost has no row views of a DMatrix: ``DMatrix.slice`` copies the selected
+rows. The rungs are therefore built once per tuning run and shared by all
+trials, holding 1/r + 1/r^2 + ... of the training matrix in extra memory.
+"""
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import xgboost as xgb
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FidelityLevel:
+    """Training data of one successive-halving rung."""
+
+    step: int
+    fraction: float
+    dtrain: xgb.DMatrix
+    scale_pos_weight: float
+
+
+def fidelity_fractions(reduction_factor, n_rungs):
+    """
+    User fractions of the rungs, growing geometrically up to the full data.
+
+    Args:
+        reduction_factor: Growth factor between rungs
+        n_rungs: Number of rungs, the last one being the full training set
+
+    Returns:
+        List of fractions, e.g. [1/9, 1/3, 1] for factor 3 and 3 rungs
+    """
+    return [float(reduction_factor) ** -(n_rungs - 1 - i) for i in range(n_rungs)]
+
+
+def user_stratified_subsample(user_ids, y, fraction, seed):
+    """
+    Row indices of a user-level subsample that keeps every positive row.
+
+    Users are split into churners (any positive row) and non-churners and the
+    same fraction of each stratum is drawn. Draws for a given ``seed`` are
+    nested: the users of a smaller fraction are included in every larger one.
+
+    Args:
+        user_ids: User id of each training row
+        y: Label of each training row
+        fraction: Fraction of users to keep per stratum
+        seed: Random seed
+
+    Returns:
+        Sorted array of row indices
+    """
+    users, inverse = np.unique(np.asarray(user_ids), return_inverse=True)
+    is_churner = np.zeros(len(users), dtype=bool)
+    np.logical_or.at(is_churner, inverse, np.asarray(y) == 1)
+
+    keys = np.random.default_rng(seed).random(len(users))
+    sampled = np.zeros(len(users), dtype=bool)
+    for stratum in (is_churner, ~is_churner):
+        members = np.flatnonzero(stratum)
+        n_keep = int(np.ceil(fraction * len(members)))
+        sampled[members[np.argsort(keys[members])[:n_keep]]] = True
+
+    return np.flatnonzero(sampled[inverse] | (np.asarray(y) == 1))
+
+
+def build_fidelity_levels(dtrain, user_ids, scale_pos_weight, reduction_factor, n_rungs, seed):
+    """
+    Build the training matrices of all rungs once, as row slices of ``dtrain``.
+
+    Each slice is a copy of its rows; build the levels once per study and
+    reuse them across trials rather than slicing per trial.
+
+    Args:
+        dtrain: Full training DMatrix
+        user_ids: User id of each ``dtrain`` row
+        scale_pos_weight: Scale weight for positive class on the full data
+        reduction_factor: Growth factor between rungs
+        n_rungs: Number of rungs
+        seed: Random seed for user sampling
+
+    Returns:
+        List of FidelityLevel, smallest first; ``step`` is the resource value
+        reported to Optuna's SuccessiveHalvingPruner (1, factor, factor^2, ...)
+    """
+    y = dtrain.get_label()
+    n_pos = max(int((y == 1).sum()), 1)
+    n_neg = max(int((y == 0).sum()), 1)
+    levels = []
+    for i, fraction in enumerate(fidelity_fractions(reduction_factor, n_rungs)):
+        if fraction >= 1.0:
+            level_dtrain, level_y = dtrain, y
+        else:
+            rows = user_stratified_subsample(user_ids, y, fraction, seed)
+            level_dtrain, level_y = dtrain.slice(rows), y[rows]
+
+        # Scale by the kept share of each class so the class balance matches the full data
+        pos_rate = int((level_y == 1).sum()) / n_pos
+        neg_rate = int((level_y == 0).sum()) / n_neg
+        level_scale_pos_weight = scale_pos_weight * neg_rate / pos_rate if pos_rate > 0 else 1.0
+        logger.info(
+            f"Fidelity rung {i}: {fraction:.3f} of users, {len(level_y)} rows, "
+            f"scale_pos_weight: {level_scale_pos_weight:.4f}"
+        )
+        levels.append(
+            FidelityLevel(
+                step=int(reduction_factor**i),
+                fraction=fraction,
+                dtrain=level_dtrain,
+                scale_pos_weight=level_scale_pos_weight,
+            )
+        )
+    return levels
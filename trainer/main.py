@@ -4,14 +4,27 @@ This script orchestrates the entire model training pipeline:
 1. Load data from BigQuery
 2. Preprocess and prepare features
 3. Split data into train/val/test sets
-4. Tune hyperparameters with Optuna
-5. Train final model
-6. Evaluate and save model
+4. Continue the previous model on new months, or tune hyperparameters with
+   Optuna and train a final model from scratch
+5. Evaluate (metrics, gain and permutation importance) and save model bundle
 """
 import logging
 
 from data_loader import load_data_from_bigquery
-from data_preprocessing import compute_scale_pos_weight, time_ordered_split
+from data_preprocessing import (
+    compute_scale_pos_weight,
+    encode_categoricals,
+    split_masks,
+    time_ordered_split,
+)
+from incremental import incremental_retrain
+from model_bundle import (
+    ModelBundle,
+    bundle_path,
+    latest_bundle_version,
+    load_model_bundle,
+    save_model_bundle,
+)
 from model_evaluation import evaluate_model
 from model_training import (
     create_dmatrix,
@@ -19,6 +32,8 @@ from model_training import (
     train_final_model,
     tune_hyperparameters,
 )
+from permutation_importance import log_permutation_importance
+from resources import apply_cpu_budget, detect_cpu_budget
 from validation import load_config
 
 
@@ -43,10 +58,30 @@ def main():
     logging.info("1. Loading data from BigQuery...")
     df = load_data_from_bigquery(config)
 
+    # Previous production model, continued when incremental retraining applies
+    model_dir = config.registry.model_dir
+    model_name = config.registry.model_name
+    latest_version = latest_bundle_version(model_dir, model_name)
+    previous = None
+    if config.incremental.enabled and latest_version is not None:
+        previous = load_model_bundle(bundle_path(model_dir, model_name, latest_version))
+
+    # Keep category codes stable with the previous model
+    categorical_encodings = encode_categoricals(
+        df, categorical_features, previous.categorical_encodings if previous else None
+    )
+
     # Split data (returns X_train, y_train, X_val, y_val, X_test, y_test)
     X_train, y_train, X_val, y_val, X_test, y_test = time_ordered_split(
         df, test_frac, val_frac, feature_cols, label_col="is_churn"
     )
+    # Row masks of the same split, to align per-row columns (dates, user ids)
+    train_mask, _, _ = split_masks(df, test_frac, val_frac)
+
+    # Split CPUs between Optuna trials, XGBoost and BLAS within the container's limits;
+    # a trial holds roughly two float32 copies of the training matrix
+    cpu_budget = detect_cpu_budget(config.resources, memory_per_trial=8 * X_train.size)
+    apply_cpu_budget(cpu_budget)
 
     # Compute scale_pos_weight
     scale_pos_weight = compute_scale_pos_weight(y_train)
@@ -60,17 +95,79 @@ def main():
         X_test, y_test, feature_cols, config.features.numeric, categorical_features
     )
 
-    # Tune hyperparameters
-    best_params = tune_hyperparameters(dtrain, dval, y_val, scale_pos_weight, n_trials)
-
-    # Train final model
-    model = train_final_model(dtrain, dval, best_params, scale_pos_weight)
+    # Continue the previous model on recent rows if that is safe
+    model = None
+    if previous is not None:
+        logging.info(f"Trying incremental retrain of {model_name} v{previous.version}...")
+        model, reason = incremental_retrain(
+            previous,
+            df,
+            train_mask,
+            dtrain,
+            dval,
+            y_val,
+            config.incremental.drift_features or config.features.numeric,
+            config.incremental,
+            cpu_budget=cpu_budget,
+        )
+        if model is None:
+            logging.info(f"Falling back to full retrain: {reason}")
+
+    if model is None:
+        # Tune hyperparameters
+        best_params = tune_hyperparameters(
+            dtrain,
+            dval,
+            y_val,
+            scale_pos_weight,
+            n_trials,
+            train_user_ids=df.loc[train_mask, "user_id"].values,
+            cpu_budget=cpu_budget,
+        )
+
+        # Train final model
+        model = train_final_model(
+            dtrain, dval, best_params, scale_pos_weight, cpu_budget=cpu_budget
+        )
+        incremental_runs = 0
+    else:
+        best_params = previous.metadata["best_params"]
+        incremental_runs = previous.metadata.get("incremental_runs", 0) + 1
 
     # Evaluate model
     metrics = evaluate_model(model, dval, dtest, y_val, y_test)
 
     # Log feature importance
     log_feature_importance(model, feature_cols, categorical_features)
+    if config.permutation_importance.enabled:
+        log_permutation_importance(
+            model,
+            {"val": (X_val, y_val), "test": (X_test, y_test)},
+            feature_cols,
+            categorical_features,
+            n_repeats=config.permutation_importance.n_repeats,
+            n_workers=config.permutation_importance.n_workers or cpu_budget.cpus,
+        )
+
+    # Save model bundle
+    bundle = ModelBundle(
+        booster=model,
+        feature_cols=feature_cols,
+        feature_types=["q"] * len(config.features.numeric) + ["c"] * len(categorical_features),
+        categorical_encodings=categorical_encodings,
+        best_iteration=getattr(model, "best_iteration", None),
+        name=model_name,
+        version=(latest_version or 0) + 1,
+        metadata={
+            "best_params": best_params,
+            "scale_pos_weight": scale_pos_weight,
+            "metrics": metrics,
+            "data_end": df["payment_date"].max(),
+            "incremental_runs": incremental_runs,
+        },
+    )
+    bundle_file = save_model_bundle(bundle, model_dir)
+    logging.info(f"Saved model bundle v{bundle.version} to {bundle_file}")
 
     return model, metrics
 
@@ -0,0 +1,221 @@
+"""
+Single-file model bundles: booster plus everything needed to score with it.
+
+Bundle layout (little endian):
+
+    magic (8 bytes) | format version (uint32) | header length (uint64)
+    | JSON header | booster as UBJSON
+
+The header carries the feature columns, feature types, categorical encodings,
+best iteration and free-form metadata, plus the length of the booster payload,
+which starts right after the header. Loading reads the small preamble and
+header first and then the booster payload in a single read.
+"""
+import json
+import os
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+BUNDLE_MAGIC = b"CHURNBDL"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_SUFFIX = ".xgbundle"
+
+_PREAMBLE = struct.Struct("<8sIQ")
+_BUNDLE_NAME = re.compile(r"^(?P<name>.+)-v(?P<version>\d+)" + re.escape(BUNDLE_SUFFIX) + "$")
+
+
+@dataclass
+class ModelBundle:
+    """Trained booster together with the context needed to score new rows."""
+
+    booster: xgb.Booster
+    feature_cols: list
+    feature_types: list
+    categorical_encodings: dict = field(default_factory=dict)
+    best_iteration: int | None = None
+    name: str = "churn"
+    version: int = 1
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def iteration_range(self):
+        """Iteration range to predict with, truncated at the best iteration."""
+        if self.best_iteration is None:
+            return (0, 0)
+        return (0, self.best_iteration + 1)
+
+    def encode(self, df):
+        """
+        Encode a raw feature DataFrame into the float32 matrix the booster expects.
+
+        Categorical columns are mapped to the codes used during training; levels
+        that were not seen in training become missing values.
+
+        Args:
+            df: DataFrame containing at least the bundle's feature columns
+
+        Returns:
+            float32 feature matrix in ``feature_cols`` order
+        """
+        X = np.empty((len(df), len(self.feature_cols)), dtype=np.float32)
+        for i, col in enumerate(self.feature_cols):
+            if col in self.categorical_encodings:
+                codes = pd.Index(self.categorical_encodings[col]).get_indexer(df[col])
+                X[:, i] = np.where(codes < 0, np.nan, codes)
+            else:
+                X[:, i] = df[col].to_numpy(dtype=np.float32)
+        return X
+
+    def predict(self, X):
+        """
+        Predict churn probabilities.
+
+        Args:
+            X: Encoded feature matrix, or a raw DataFrame (encoded via ``encode``)
+
+        Returns:
+            Array of predicted probabilities
+        """
+        if isinstance(X, pd.DataFrame):
+            X = self.encode(X)
+        dmatrix = xgb.DMatrix(
+            X,
+            feature_names=self.feature_cols,
+            feature_types=self.feature_types,
+            enable_categorical=True,
+        )
+        return self.booster.predict(dmatrix, iteration_range=self.iteration_range)
+
+
+def bundle_path(model_dir, name, version):
+    """Path of version ``version`` of model ``name`` inside ``model_dir``."""
+    return Path(model_dir) / f"{name}-v{int(version)}{BUNDLE_SUFFIX}"
+
+
+def list_bundle_versions(model_dir, name):
+    """
+    List the versions of a model available in a directory.
+
+    Args:
+        model_dir: Directory holding bundle files
+        name: Model name
+
+    Returns:
+        Sorted list of version numbers
+    """
+    model_dir = Path(model_dir)
+    if not model_dir.is_dir():
+        return []
+    versions = []
+    for path in model_dir.iterdir():
+        match = _BUNDLE_NAME.match(path.name)
+        if match and match.group("name") == name:
+            versions.append(int(match.group("version")))
+    return sorted(versions)
+
+
+def latest_bundle_version(model_dir, name):
+    """Highest available version of a model, or None if there is none."""
+    versions = list_bundle_versions(model_dir, name)
+    return versions[-1] if versions else None
+
+
+def save_model_bundle(bundle, model_dir):
+    """
+    Write a bundle to ``model_dir`` as ``<name>-v<version>.xgbundle``.
+
+    The file is written next to its final location and renamed into place, so
+    readers (e.g. a ``ModelRegistry`` watching the directory) never see a
+    partially written bundle.
+
+    Args:
+        bundle: ModelBundle to save
+        model_dir: Target directory (created if missing)
+
+    Returns:
+        Path of the written bundle
+    """
+    path = bundle_path(model_dir, bundle.name, bundle.version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    booster_raw = bundle.booster.save_raw(raw_format="ubj")
+    header = {
+        "name": bundle.name,
+        "version": int(bundle.version),
+        "feature_cols": list(bundle.feature_cols),
+        "feature_types": list(bundle.feature_types),
+        "categorical_encodings": bundle.categorical_encodings,
+        "best_iteration": bundle.best_iteration,
+        "metadata": bundle.metadata,
+        "booster_length": len(booster_raw),
+    }
+    header_raw = json.dumps(header, default=_json_default).encode("utf-8")
+
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(header_raw)))
+        f.write(header_raw)
+        f.write(booster_raw)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model_bundle(path):
+    """
+    Load a bundle written by ``save_model_bundle``.
+
+    Args:
+        path: Path to the bundle file
+
+    Returns:
+        ModelBundle
+
+    Raises:
+        ValueError: If the file is not a bundle or uses an unsupported format version
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"Not a model bundle: {path}")
+        magic, format_version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"Not a model bundle: {path}")
+        if format_version > BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Bundle format version {format_version} is newer than supported "
+                f"version {BUNDLE_FORMAT_VERSION}: {path}"
+            )
+        header = json.loads(f.read(header_len))
+
+        length = header["booster_length"]
+        booster_raw = f.read(length)
+        if len(booster_raw) != length:
+            raise ValueError(f"Truncated model bundle: {path}")
+    booster = xgb.Booster()
+    booster.load_model(bytearray(booster_raw))
+
+    return ModelBundle(
+        booster=booster,
+        feature_cols=header["feature_cols"],
+        feature_types=header["feature_types"],
+        categorical_encodings=header["categorical_encodings"],
+        best_iteration=header["best_iteration"],
+        name=header["name"],
+        version=header["version"],
+        metadata=header["metadata"],
+    )
+
+
+def _json_default(value):
+    """Serialize NumPy scalars and timestamps found in bundle metadata."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
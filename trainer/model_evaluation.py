@@ -2,7 +2,6 @@
 Model evaluation and metrics calculation.
 """
 import numpy as np
-from sklearn.metrics import average_precision_score, roc_auc_score
 
 
 def precision_at_k(y_true, y_score, k=0.05):
@@ -22,6 +21,49 @@ def precision_at_k(y_true, y_score, k=0.05):
     return (y_true[top_idx] == 1).mean()
 
 
+def ranking_metrics(y_true, y_score, ks=(0.05, 0.10)):
+    """
+    PR-AUC, ROC-AUC and precision@k from a single sort of the scores.
+
+    PR-AUC is average precision; tied scores form one threshold, as in
+    scikit-learn's ``average_precision_score`` and ``roc_auc_score``.
+
+    Args:
+        y_true: True labels (0/1)
+        y_score: Predicted scores
+        ks: Fractions of top predictions for precision@k
+
+    Returns:
+        Dictionary with pr_auc, roc_auc and precision_at_<100k> entries
+    """
+    y_true = np.asarray(y_true)
+    y_score = np.asarray(y_score)
+    # Descending order; reversing the ascending argsort keeps precision_at_k's top-k set
+    order = np.argsort(y_score)[::-1]
+    y_sorted = y_true[order] == 1
+    score_sorted = y_score[order]
+
+    # Last index of each group of tied scores
+    threshold_idx = np.r_[np.flatnonzero(np.diff(score_sorted)), len(y_sorted) - 1]
+    tps = np.cumsum(y_sorted)[threshold_idx]
+    fps = threshold_idx + 1 - tps
+    n_pos, n_neg = tps[-1], fps[-1]
+
+    metrics = {"pr_auc": float("nan"), "roc_auc": float("nan")}
+    if n_pos > 0:
+        precision = tps / (tps + fps)
+        recall_step = np.diff(np.r_[0, tps]) / n_pos
+        metrics["pr_auc"] = float(np.sum(recall_step * precision))
+    if n_pos > 0 and n_neg > 0:
+        tpr = np.r_[0, tps] / n_pos
+        fpr = np.r_[0, fps] / n_neg
+        metrics["roc_auc"] = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    for k in ks:
+        n = max(1, int(np.floor(k * len(y_sorted))))
+        metrics[f"precision_at_{round(k * 100)}"] = float(y_sorted[:n].mean())
+    return metrics
+
+
 def evaluate_model(model, dval, dtest, y_val, y_test):
     """
     Evaluate model performance on validation and test sets.
@@ -38,27 +80,25 @@ def evaluate_model(model, dval, dtest, y_val, y_test):
     """
     best_it = getattr(model, "best_iteration", None)
 
-    if best_it:
+    if best_it is not None:
         proba_val = model.predict(dval, iteration_range=(0, best_it + 1))
         proba_test = model.predict(dtest, iteration_range=(0, best_it + 1))
     else:
         proba_val = model.predict(dval)
         proba_test = model.predict(dtest)
 
-    pr_auc_val = average_precision_score(y_val, proba_val)
-    roc_auc_val = roc_auc_score(y_val, proba_val)
-    pr_auc_test = average_precision_score(y_test, proba_test)
-    roc_auc_test = roc_auc_score(y_test, proba_test)
+    val = ranking_metrics(y_val, proba_val)
+    test = ranking_metrics(y_test, proba_test)
 
     metrics = {
-        "pr_auc_val": pr_auc_val,
-        "roc_auc_val": roc_auc_val,
-        "pr_auc_test": pr_auc_test,
-        "roc_auc_test": roc_auc_test,
-        "precision_at_5_val": precision_at_k(y_val, proba_val, k=0.05),
-        "precision_at_5_test": precision_at_k(y_test, proba_test, k=0.05),
-        "precision_at_10_val": precision_at_k(y_val, proba_val, k=0.10),
-        "precision_at_10_test": precision_at_k(y_test, proba_test, k=0.10),
+        "pr_auc_val": val["pr_auc"],
+        "roc_auc_val": val["roc_auc"],
+        "pr_auc_test": test["pr_auc"],
+        "roc_auc_test": test["roc_auc"],
+        "precision_at_5_val": val["precision_at_5"],
+        "precision_at_5_test": test["precision_at_5"],
+        "precision_at_10_val": val["precision_at_10"],
+        "precision_at_10_test": test["precision_at_10"],
     }
 
     return metrics
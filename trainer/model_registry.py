@@ -0,0 +1,147 @@
+"""
+In-process registry of model bundles with LRU eviction and hot reload.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from model_bundle import bundle_path, latest_bundle_version, load_model_bundle
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Keep the most recently used model bundles of a directory in memory.
+
+    ``get`` always returns a fully loaded bundle. New versions are loaded
+    outside the registry lock and swapped in with a single dictionary
+    assignment, so callers that already hold a bundle keep predicting with it
+    while the next call picks up the new version.
+
+    Args:
+        model_dir: Directory holding ``<name>-v<version>.xgbundle`` files
+        capacity: Maximum number of models kept in memory
+    """
+
+    def __init__(self, model_dir, capacity=4):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.model_dir = model_dir
+        self.capacity = capacity
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._models
+
+    def __len__(self):
+        with self._lock:
+            return len(self._models)
+
+    def get(self, name):
+        """
+        Return the cached bundle for ``name``, loading the latest version if needed.
+
+        Args:
+            name: Model name
+
+        Returns:
+            ModelBundle
+
+        Raises:
+            FileNotFoundError: If no bundle exists for ``name``
+        """
+        with self._lock:
+            bundle = self._models.get(name)
+            if bundle is not None:
+                self._models.move_to_end(name)
+                return bundle
+
+        version = latest_bundle_version(self.model_dir, name)
+        if version is None:
+            raise FileNotFoundError(f"No bundle for model '{name}' in {self.model_dir}")
+        bundle = load_model_bundle(bundle_path(self.model_dir, name, version))
+
+        with self._lock:
+            # Another thread may have loaded the same (or a newer) version meanwhile
+            current = self._models.get(name)
+            if current is not None and current.version >= bundle.version:
+                self._models.move_to_end(name)
+                return current
+            self._insert(name, bundle)
+        return bundle
+
+    def predict(self, name, X):
+        """Predict with the current version of model ``name``."""
+        return self.get(name).predict(X)
+
+    def refresh(self):
+        """
+        Hot-swap every cached model for which a newer version exists on disk.
+
+        Returns:
+            Dictionary of model name to newly loaded version
+        """
+        with self._lock:
+            cached = {name: bundle.version for name, bundle in self._models.items()}
+
+        swapped = {}
+        for name, version in cached.items():
+            latest = latest_bundle_version(self.model_dir, name)
+            if latest is None or latest <= version:
+                continue
+            try:
+                bundle = load_model_bundle(bundle_path(self.model_dir, name, latest))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load {name} v{latest}, keeping v{version}: {e}")
+                continue
+
+            with self._lock:
+                current = self._models.get(name)
+                # Skip models that were evicted or already replaced while loading
+                if current is None or current.version >= bundle.version:
+                    continue
+                self._models[name] = bundle
+            swapped[name] = bundle.version
+            logger.info(f"Hot-swapped model {name}: v{version} -> v{bundle.version}")
+        return swapped
+
+    def start_watching(self, interval=30.0):
+        """
+        Poll the model directory for new versions in a background thread.
+
+        Args:
+            interval: Seconds between directory scans
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("Model registry refresh failed")
+
+        self._watcher = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Stop the background watcher started by ``start_watching``."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _insert(self, name, bundle):
+        """Insert a bundle as most recently used and evict beyond capacity. Lock must be held."""
+        self._models[name] = bundle
+        self._models.move_to_end(name)
+        while len(self._models) > self.capacity:
+            evicted, _ = self._models.popitem(last=False)
+            logger.info(f"Evicted model {evicted} from registry")
@@ -2,10 +2,21 @@
 Model training and hyperparameter tuning with Optuna.
 """
 import logging
+from datetime import datetime, timezone
 
 import optuna
 import xgboost as xgb
+from fidelity import build_fidelity_levels
+from resources import detect_cpu_budget
 from sklearn.metrics import average_precision_score
+from study_store import (
+    RUN_ID_ATTR,
+    RunScopedPruner,
+    best_trial_of_run,
+    enqueue_warm_starts,
+    load_or_create_study,
+    study_fingerprint,
+)
 from validation import load_config
 
 logger = logging.getLogger(__name__)
@@ -38,16 +49,32 @@ def create_dmatrix(
     return dmatrix
 
 
-def tune_hyperparameters(dtrain, dval, y_val, scale_pos_weight, n_trials=None):
+def tune_hyperparameters(
+    dtrain, dval, y_val, scale_pos_weight, n_trials=None, train_user_ids=None, cpu_budget=None
+):
     """
     Tune hyperparameters using Optuna.
 
+    If ``model.multi_fidelity.enabled`` is set, each trial climbs successive-
+    halving rungs: it trains on user-stratified subsamples of ``dtrain`` first
+    and is pruned unless it ranks among the best at each rung, so only
+    promising configurations reach the full training set.
+
+    If ``model.study_storage`` is configured, trials are stored in a persistent
+    study keyed by the feature set and search space: the TPE sampler sees all
+    earlier trials and the best earlier configurations are re-evaluated first.
+    Only trials of the current run compete at pruning rungs and for the
+    returned best params.
+
     Args:
         dtrain: Training DMatrix
         dval: Validation DMatrix
         y_val: Validation labels
         scale_pos_weight: Scale weight for positive class
         n_trials: Number of Optuna trials (if None, uses config value)
+        train_user_ids: User id of each dtrain row (required for multi-fidelity tuning)
+        cpu_budget: CpuBudget splitting CPUs between concurrent trials and XGBoost
+            threads (if None, detected from the container's cgroup limits)
 
     Returns:
         Best hyperparameters dictionary
@@ -55,13 +82,37 @@ def tune_hyperparameters(dtrain, dval, y_val, scale_pos_weight, n_trials=None):
     config = load_config()
     if n_trials is None:
         n_trials = config.model.n_trials
+    if cpu_budget is None:
+        cpu_budget = detect_cpu_budget(config.resources)
+    # Each concurrent trial gets its share of the CPUs instead of every host core
+    fixed_params = {**config.model.fixed_params, "nthread": cpu_budget.xgb_threads}
 
     logger.info("Starting Optuna hyperparameter tuning")
+    multi_fidelity = config.model.multi_fidelity
+    if multi_fidelity.enabled:
+        if train_user_ids is None:
+            raise ValueError("train_user_ids is required for multi-fidelity tuning")
+        levels = build_fidelity_levels(
+            dtrain,
+            train_user_ids,
+            scale_pos_weight,
+            multi_fidelity.reduction_factor,
+            multi_fidelity.n_rungs,
+            config.data.random_state,
+        )
+        pruner = optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=1, reduction_factor=multi_fidelity.reduction_factor
+        )
+    else:
+        levels = None
+        pruner = None
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
 
     def objective(trial):
+        trial.set_user_attr(RUN_ID_ATTR, run_id)
         # Start with fixed params
         param = {
-            **config.model.fixed_params,
+            **fixed_params,
             "seed": config.data.random_state,
             "scale_pos_weight": scale_pos_weight,
         }
@@ -75,31 +126,73 @@ def tune_hyperparameters(dtrain, dval, y_val, scale_pos_weight, n_trials=None):
                     hp_name, hp_range.min, hp_range.max, log=hp_range.log
                 )
 
-        bst_trial = xgb.train(
-            param,
-            dtrain,
-            num_boost_round=config.model.num_boost_round,
-            evals=[(dval, "val")],
-            early_stopping_rounds=config.model.early_stopping_rounds,
-            verbose_eval=False,
-        )
-        preds = bst_trial.predict(dval)
+        if levels is None:
+            bst_trial = xgb.train(
+                param,
+                dtrain,
+                num_boost_round=config.model.num_boost_round,
+                evals=[(dval, "val")],
+                early_stopping_rounds=config.model.early_stopping_rounds,
+                verbose_eval=False,
+            )
+            preds = bst_trial.predict(dval)
+
+            return average_precision_score(y_val, preds)
 
-        return average_precision_score(y_val, preds)
+        for level in levels:
+            bst_trial = xgb.train(
+                {**param, "scale_pos_weight": level.scale_pos_weight},
+                level.dtrain,
+                num_boost_round=config.model.num_boost_round,
+                evals=[(dval, "val")],
+                early_stopping_rounds=config.model.early_stopping_rounds,
+                verbose_eval=False,
+            )
+            score = average_precision_score(y_val, bst_trial.predict(dval))
+            if level is levels[-1]:
+                # The full-data rung is the trial's result, not a pruning decision
+                return score
+            trial.report(score, level.step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
 
-    study = optuna.create_study(
-        direction="maximize", sampler=optuna.samplers.TPESampler(seed=config.data.random_state)
+    sampler = optuna.samplers.TPESampler(seed=config.data.random_state)
+    if config.model.study_storage:
+        fingerprint = study_fingerprint(
+            dtrain.feature_names,
+            dtrain.feature_types,
+            config.model.hyperparameter_ranges,
+            config.model.fixed_params,
+        )
+        if pruner is not None:
+            # Rungs of earlier runs were scored on other data and must not compete
+            pruner = RunScopedPruner(pruner, run_id)
+        study = load_or_create_study(config.model.study_storage, fingerprint, sampler, pruner)
+        # Leave at least half of the budget for new configurations
+        enqueue_warm_starts(study, min(config.model.warm_start_top_k, max(1, n_trials // 2)))
+    else:
+        study = optuna.create_study(direction="maximize", sampler=sampler, pruner=pruner)
+    study.optimize(
+        objective, n_trials=n_trials, n_jobs=cpu_budget.trial_workers, show_progress_bar=True
     )
-    study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
 
+    best_trial = best_trial_of_run(study, run_id)
     logger.info("Optuna tuning complete")
-    logger.info(f"Best trial PR-AUC: {study.best_trial.value}")
-    logger.info(f"Best hyperparameters: {study.best_params}")
+    logger.info(f"Best trial PR-AUC: {best_trial.value}")
+    logger.info(f"Best hyperparameters: {best_trial.params}")
 
-    return study.best_params
+    return best_trial.params
 
 
-def train_final_model(dtrain, dval, best_params, scale_pos_weight):
+def train_final_model(
+    dtrain,
+    dval,
+    best_params,
+    scale_pos_weight,
+    xgb_model=None,
+    num_boost_round=None,
+    cpu_budget=None,
+):
     """
     Train the final model with best hyperparameters.
 
@@ -108,11 +201,17 @@ def train_final_model(dtrain, dval, best_params, scale_pos_weight):
         dval: Validation DMatrix
         best_params: Best hyperparameters from tuning
         scale_pos_weight: Scale weight for positive class
+        xgb_model: Existing booster to continue training; new trees are appended
+        num_boost_round: Maximum boosting rounds (if None, uses config value)
+        cpu_budget: CpuBudget; the final model trains alone and uses all its CPUs
+            (if None, detected from the container's cgroup limits)
 
     Returns:
         Trained XGBoost model
     """
     config = load_config()
+    if cpu_budget is None:
+        cpu_budget = detect_cpu_budget(config.resources)
     final_params = {
         "objective": "binary:logistic",
         "eval_metric": "aucpr",
@@ -121,17 +220,22 @@ def train_final_model(dtrain, dval, best_params, scale_pos_weight):
         "scale_pos_weight": scale_pos_weight,
         "tree_method": "hist",
         "max_cat_to_onehot": 4,
+        "nthread": cpu_budget.cpus,
         **best_params,
     }
 
+    if num_boost_round is None:
+        num_boost_round = config.model.num_boost_round
+
     logger.info("Training final model")
     bst = xgb.train(
         final_params,
         dtrain,
-        num_boost_round=config.model.num_boost_round,
+        num_boost_round=num_boost_round,
         evals=[(dtrain, "train"), (dval, "val")],
         early_stopping_rounds=config.model.early_stopping_rounds,
         verbose_eval=20,
+        xgb_model=xgb_model,
     )
 
     return bst
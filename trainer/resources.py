@@ -0,0 +1,207 @@
+"""
+Container-aware CPU budgeting for XGBoost, Optuna and BLAS threads.
+
+``os.cpu_count()`` reports the host's cores, not the container's share: in a
+Vertex AI container limited with ``set_cpu_limit("4")`` on a 32-core host,
+XGBoost, OpenMP and BLAS would each start 32 threads on 4 CPUs of quota. The
+budget is derived from the cgroup CPU quota, the CPU affinity mask and the
+cgroup memory limit, then split between concurrent Optuna trials and the
+XGBoost threads of each trial.
+
+Only the limits of the process' own cgroup are read; containers see their
+cgroup mounted at the root of ``/sys/fs/cgroup`` (v2) or of each controller
+directory (v1).
+"""
+import logging
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from threadpoolctl import threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Environment variables read by OpenMP and the BLAS libraries when they start
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+# cgroup v1 reports "no limit" as a huge page-aligned number
+_V1_UNLIMITED_MEMORY = 1 << 60
+
+
+@dataclass
+class CpuBudget:
+    """Thread allocation of the trainer process."""
+
+    cpus: int
+    memory_limit: int | None
+    trial_workers: int
+    xgb_threads: int
+    blas_threads: int
+
+    def thread_env(self):
+        """Environment variables limiting OpenMP/BLAS pools, e.g. for child processes."""
+        return {name: str(self.blas_threads) for name in THREAD_ENV_VARS}
+
+
+def _read(path):
+    try:
+        return Path(path).read_text().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(root=CGROUP_ROOT):
+    """
+    CPU quota of the cgroup in CPUs (e.g. 4.0), or None if unlimited.
+
+    Reads ``cpu.max`` (cgroup v2) or ``cpu.cfs_quota_us`` / ``cpu.cfs_period_us``
+    (cgroup v1).
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        Quota as a fraction of CPUs, or None
+    """
+    root = Path(root)
+    cpu_max = _read(root / "cpu.max")
+    if cpu_max is not None:
+        quota, _, period = cpu_max.partition(" ")
+        if quota == "max":
+            return None
+        return int(quota) / int(period or 100000)
+
+    for controller in ("cpu", "cpu,cpuacct"):
+        quota = _read(root / controller / "cpu.cfs_quota_us")
+        period = _read(root / controller / "cpu.cfs_period_us")
+        if quota is not None and period is not None:
+            return int(quota) / int(period) if int(quota) > 0 else None
+    return None
+
+
+def cgroup_memory_limit(root=CGROUP_ROOT):
+    """
+    Memory limit of the cgroup in bytes, or None if unlimited.
+
+    Reads ``memory.max`` (cgroup v2) or ``memory.limit_in_bytes`` (cgroup v1).
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        Limit in bytes, or None
+    """
+    root = Path(root)
+    limit = _read(root / "memory.max")
+    if limit is None:
+        limit = _read(root / "memory" / "memory.limit_in_bytes")
+    if limit is None or limit == "max" or int(limit) >= _V1_UNLIMITED_MEMORY:
+        return None
+    return int(limit)
+
+
+def available_cpus(root=CGROUP_ROOT):
+    """
+    Number of CPUs the process can actually use.
+
+    The smaller of the affinity mask and the cgroup quota; fractional quotas
+    are rounded down, with a minimum of one CPU.
+
+    Args:
+        root: cgroup filesystem mount point
+
+    Returns:
+        Number of CPUs
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        cpus = min(cpus, max(1, math.floor(quota)))
+    return cpus
+
+
+def plan_cpu_budget(cpus, memory_limit=None, trial_workers=1, memory_per_trial=None):
+    """
+    Split CPUs between concurrent Optuna trials and XGBoost threads.
+
+    Concurrent trials are capped by the CPUs and, when both are known, by how
+    many trials fit into the memory limit. Each trial gets an equal share of
+    the CPUs as XGBoost ``nthread``; BLAS pools get the same share, since BLAS
+    calls run in a trial's thread between boosting rounds, never alongside them.
+
+    Args:
+        cpus: Available CPUs (see ``available_cpus``)
+        memory_limit: Memory limit in bytes, or None
+        trial_workers: Requested concurrent trials
+        memory_per_trial: Estimated peak memory of one trial in bytes, or None
+
+    Returns:
+        CpuBudget
+    """
+    workers = max(1, min(trial_workers, cpus))
+    if memory_limit is not None and memory_per_trial:
+        workers = max(1, min(workers, memory_limit // memory_per_trial))
+    threads = max(1, cpus // workers)
+    return CpuBudget(
+        cpus=cpus,
+        memory_limit=memory_limit,
+        trial_workers=workers,
+        xgb_threads=threads,
+        blas_threads=threads,
+    )
+
+
+def detect_cpu_budget(resources_config=None, memory_per_trial=None):
+    """
+    Budget for this process from its cgroup limits and the resources config.
+
+    Args:
+        resources_config: ResourcesConfig (cgroup root, CPU override, trial workers)
+        memory_per_trial: Estimated peak memory of one trial in bytes, or None
+
+    Returns:
+        CpuBudget
+    """
+    root = resources_config.cgroup_root if resources_config else CGROUP_ROOT
+    cpus = (resources_config.cpus if resources_config else None) or available_cpus(root)
+    budget = plan_cpu_budget(
+        cpus,
+        memory_limit=cgroup_memory_limit(root),
+        trial_workers=resources_config.trial_workers if resources_config else 1,
+        memory_per_trial=memory_per_trial,
+    )
+    memory = f"{budget.memory_limit / 2**30:.1f} GiB" if budget.memory_limit else "unlimited"
+    logger.info(
+        f"CPU budget: {budget.cpus} CPUs (host reports {os.cpu_count()}), memory {memory}, "
+        f"{budget.trial_workers} concurrent trials x {budget.xgb_threads} XGBoost threads"
+    )
+    return budget
+
+
+def apply_cpu_budget(budget):
+    """
+    Limit OpenMP/BLAS thread pools of this process and its future children.
+
+    Environment variables only affect libraries loaded afterwards (and child
+    processes), so pools that are already loaded are resized via threadpoolctl.
+
+    Args:
+        budget: CpuBudget
+
+    Returns:
+        threadpoolctl limiter (can be used to restore the previous limits)
+    """
+    os.environ.update(budget.thread_env())
+    return threadpool_limits(limits=budget.blas_threads, user_api="blas")
@@ -0,0 +1,208 @@
+"""
+Change-aware scoring cache for batch prediction.
+
+Most users' feature rows are identical from one nightly batch to the next, so
+their scores are too. Each encoded float32 row is hashed to a 64-bit key
+seeded with the model version; keys already in the cache reuse the stored
+score and only new or changed rows are sent to the booster.
+
+Per model version the cache is a sorted ``uint64`` key array with a parallel
+``float32`` score array, looked up with ``np.searchsorted`` and stored on
+disk as ``<name>-v<version>.npz``. Only the newest ``max_versions`` versions
+are kept; older ones are evicted from memory and disk.
+"""
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_SUFFIX = ".npz"
+
+_CACHE_NAME = re.compile(r"^(?P<name>.+)-v(?P<version>\d+)" + re.escape(CACHE_SUFFIX) + "$")
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_CANONICAL_NAN = np.uint32(0x7FC00000)
+_MASK_64 = (1 << 64) - 1
+
+
+def _finalize(h):
+    """SplitMix64 finalizer, in place on a uint64 array."""
+    h ^= h >> np.uint64(30)
+    h *= _MIX_1
+    h ^= h >> np.uint64(27)
+    h *= _MIX_2
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def hash_rows(X, seed=0):
+    """
+    64-bit hash of each row of a float32 matrix.
+
+    Rows are hashed on their bit patterns, two columns (one uint64 word) per
+    vectorized pass. ``-0.0`` and ``0.0`` hash alike, as do all NaN payloads,
+    since the booster treats them alike.
+
+    Args:
+        X: 2-D feature matrix (converted to float32)
+        seed: Integer mixed into every hash, e.g. the model version
+
+    Returns:
+        uint64 array with one hash per row
+    """
+    X = np.asarray(X, dtype=np.float32)
+    if X.ndim == 1:
+        X = X[np.newaxis, :]
+    n_rows, n_features = X.shape
+
+    # Pad to an even width so each row is a whole number of uint64 words
+    bits = np.zeros((n_rows, n_features + n_features % 2), dtype=np.float32)
+    np.add(X, np.float32(0.0), out=bits[:, :n_features])
+    bits = bits.view(np.uint32)
+    bits[:, :n_features][np.isnan(X)] = _CANONICAL_NAN
+    words = bits.view(np.uint64)
+
+    h = np.full(n_rows, (int(seed) * 0x100000001B3 + n_features) & _MASK_64, dtype=np.uint64)
+    _finalize(h)
+    for j in range(words.shape[1]):
+        h ^= words[:, j]
+        h *= _GOLDEN
+        h ^= h >> np.uint64(32)
+    return _finalize(h)
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counts of a scoring cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self):
+        """Fraction of looked-up rows served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ScoringCache:
+    """
+    Reuse scores of unchanged feature rows across batches.
+
+    Args:
+        cache_dir: Directory holding the per-version key/score files
+        max_versions: Number of most recent model versions kept per model name
+    """
+
+    def __init__(self, cache_dir, max_versions=2):
+        if max_versions < 1:
+            raise ValueError(f"max_versions must be at least 1, got {max_versions}")
+        self.cache_dir = Path(cache_dir)
+        self.max_versions = max_versions
+        self.stats = CacheStats()
+        self._tables = {}
+
+    def cache_path(self, name, version):
+        """Path of the key/score file of one model version."""
+        return self.cache_dir / f"{name}-v{int(version)}{CACHE_SUFFIX}"
+
+    def score(self, bundle, X):
+        """
+        Score a batch, sending only uncached rows to the booster.
+
+        Args:
+            bundle: ModelBundle to score with
+            X: Encoded feature matrix, or a raw DataFrame (encoded via ``bundle.encode``)
+
+        Returns:
+            float32 array of predicted probabilities
+        """
+        if isinstance(X, pd.DataFrame):
+            X = bundle.encode(X)
+        X = np.asarray(X, dtype=np.float32)
+        keys = hash_rows(X, seed=bundle.version)
+        cached_keys, cached_scores = self._table(bundle.name, bundle.version)
+
+        pos = np.searchsorted(cached_keys, keys)
+        hit = pos < len(cached_keys)
+        hit[hit] = cached_keys[pos[hit]] == keys[hit]
+
+        scores = np.empty(len(keys), dtype=np.float32)
+        scores[hit] = cached_scores[pos[hit]]
+        if not hit.all():
+            # Duplicate rows within the batch are scored once
+            new_keys, first, inverse = np.unique(keys[~hit], return_index=True, return_inverse=True)
+            new_scores = bundle.predict(X[np.flatnonzero(~hit)[first]]).astype(np.float32)
+            scores[~hit] = new_scores[inverse]
+            self._insert(bundle.name, bundle.version, new_keys, new_scores)
+
+        n_hits = int(hit.sum())
+        self.stats.hits += n_hits
+        self.stats.misses += len(keys) - n_hits
+        logger.info(
+            f"Scored {len(keys)} rows with {bundle.name} v{bundle.version}: "
+            f"{n_hits} cached, {len(keys) - n_hits} rescored "
+            f"(hit rate {n_hits / len(keys) if len(keys) else 0.0:.2%})"
+        )
+        return scores
+
+    def save(self):
+        """Write every in-memory version to disk (atomically, via rename)."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for (name, version), (keys, scores) in self._tables.items():
+            path = self.cache_path(name, version)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, keys=keys, scores=scores)
+            os.replace(tmp_path, path)
+
+    def cached_versions(self, name):
+        """Sorted versions of model ``name`` cached in memory or on disk."""
+        versions = {version for cached_name, version in self._tables if cached_name == name}
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.iterdir():
+                match = _CACHE_NAME.match(path.name)
+                if match and match.group("name") == name:
+                    versions.add(int(match.group("version")))
+        return sorted(versions)
+
+    def _table(self, name, version):
+        """Sorted keys and scores of one version, loading them and evicting stale versions."""
+        table = self._tables.get((name, version))
+        if table is not None:
+            return table
+
+        path = self.cache_path(name, version)
+        if path.exists():
+            with np.load(path) as data:
+                table = (data["keys"], data["scores"])
+        else:
+            table = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.float32))
+        self._tables[(name, version)] = table
+        self._evict(name, in_use=version)
+        return self._tables[(name, version)]
+
+    def _insert(self, name, version, new_keys, new_scores):
+        """Merge sorted, uncached keys into the sorted table in one pass."""
+        keys, scores = self._tables[(name, version)]
+        pos = np.searchsorted(keys, new_keys)
+        self._tables[(name, version)] = (
+            np.insert(keys, pos, new_keys),
+            np.insert(scores, pos, new_scores),
+        )
+
+    def _evict(self, name, in_use):
+        """Drop all but the newest ``max_versions`` versions, never the one in use."""
+        versions = self.cached_versions(name)
+        stale = [v for v in versions[: -self.max_versions] if v != in_use]
+        for version in stale:
+            self._tables.pop((name, version), None)
+            self.cache_path(name, version).unlink(missing_ok=True)
+            logger.info(f"Evicted scoring cache of {name} v{version}")
@@ -0,0 +1,199 @@
+"""
+Persistent Optuna studies shared across pipeline runs.
+
+Studies are keyed by a fingerprint of the feature set and the search space, so
+a retrain on more data keeps sampling from everything earlier runs learned
+while a change to features or ranges starts a fresh study.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import optuna
+from optuna.storages.journal import JournalFileBackend, JournalFileOpenLock, JournalStorage
+from optuna.trial import TrialState
+
+logger = logging.getLogger(__name__)
+
+RUN_ID_ATTR = "run_id"
+WARM_START_ATTR = "warm_start"
+
+
+def study_fingerprint(feature_names, feature_types, hyperparameter_ranges, fixed_params):
+    """
+    Fingerprint the feature set and search space of a tuning run.
+
+    Args:
+        feature_names: List of feature column names
+        feature_types: List of XGBoost feature types ('q' or 'c')
+        hyperparameter_ranges: Mapping of parameter name to range (dict or pydantic model)
+        fixed_params: Fixed XGBoost parameters
+
+    Returns:
+        16-character hex fingerprint
+    """
+    ranges = {
+        name: hp_range.model_dump() if hasattr(hp_range, "model_dump") else dict(hp_range)
+        for name, hp_range in hyperparameter_ranges.items()
+    }
+    payload = {
+        "features": list(zip(feature_names, feature_types)),
+        "hyperparameter_ranges": ranges,
+        "fixed_params": fixed_params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def create_storage(storage):
+    """
+    Build an Optuna storage from a config value.
+
+    Args:
+        storage: Optuna storage URL (e.g. ``sqlite:///studies.db``) or a path to a
+            journal file, which may live on a mounted volume
+
+    Returns:
+        Optuna storage (URL string or JournalStorage)
+    """
+    if "://" in storage:
+        return storage
+    path = Path(storage)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return JournalStorage(JournalFileBackend(str(path), lock_obj=JournalFileOpenLock(str(path))))
+
+
+def load_or_create_study(storage, fingerprint, sampler, pruner=None):
+    """
+    Open the persistent study for a fingerprint, creating it on first use.
+
+    Args:
+        storage: Storage config value, see ``create_storage``
+        fingerprint: Study fingerprint from ``study_fingerprint``
+        sampler: Optuna sampler; it sees every earlier trial stored in the study
+        pruner: Optional Optuna pruner
+
+    Returns:
+        Optuna study
+    """
+    study = optuna.create_study(
+        study_name=f"churn-{fingerprint}",
+        storage=create_storage(storage),
+        direction="maximize",
+        sampler=sampler,
+        pruner=pruner,
+        load_if_exists=True,
+    )
+    n_previous = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)))
+    logger.info(f"Opened study {study.study_name} with {n_previous} completed trials")
+    return study
+
+
+def enqueue_warm_starts(study, top_k):
+    """
+    Enqueue the best ``top_k`` distinct parameter sets from earlier runs.
+
+    They are re-evaluated first in the current run, so the previous best is
+    always scored on the new data.
+
+    Args:
+        study: Persistent Optuna study
+        top_k: Number of earlier configurations to re-evaluate
+
+    Returns:
+        Number of enqueued trials
+    """
+    if top_k <= 0:
+        return 0
+    completed = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    completed = sorted(completed, key=lambda t: t.value, reverse=True)
+
+    seen = set()
+    for trial in completed:
+        key = tuple(sorted(trial.params.items()))
+        if key in seen:
+            continue
+        seen.add(key)
+        study.enqueue_trial(trial.params, user_attrs={WARM_START_ATTR: True})
+        if len(seen) == top_k:
+            break
+    if seen:
+        logger.info(f"Enqueued {len(seen)} warm-start trials from earlier runs")
+    return len(seen)
+
+
+class _RunView:
+    """Study proxy whose ``get_trials`` only returns trials of one run."""
+
+    def __init__(self, study, run_id):
+        self._study = study
+        self._run_id = run_id
+
+    def __getattr__(self, name):
+        return getattr(self._study, name)
+
+    def get_trials(self, deepcopy=True, states=None):
+        return [
+            t
+            for t in self._study.get_trials(deepcopy=deepcopy, states=states)
+            if t.user_attrs.get(RUN_ID_ATTR) == self._run_id
+        ]
+
+
+class RunScopedPruner(optuna.pruners.BasePruner):
+    """
+    Pruner comparing a trial only with trials of the same run.
+
+    Successive halving ranks a trial against every trial that reached the same
+    rung. In a persistent study those include earlier runs scored on other
+    data, which can prune every trial of a run whose scores are lower overall.
+
+    Args:
+        pruner: Wrapped Optuna pruner, e.g. ``SuccessiveHalvingPruner``
+        run_id: Run identifier stored as the ``run_id`` user attribute
+    """
+
+    def __init__(self, pruner, run_id):
+        self._pruner = pruner
+        self._run_id = run_id
+
+    def prune(self, study, trial):
+        return self._pruner.prune(_RunView(study, self._run_id), trial)
+
+
+def best_trial_of_run(study, run_id):
+    """
+    Best completed trial of one run.
+
+    Earlier runs scored their trials on older data, so only trials tagged with
+    the current ``run_id`` compete for the final pick. If none of them
+    completed, the warm-start re-evaluation that got furthest (the earlier
+    runs' best configuration) is returned instead.
+
+    Args:
+        study: Optuna study
+        run_id: Run identifier stored as the ``run_id`` user attribute
+
+    Returns:
+        Best FrozenTrial of the run
+
+    Raises:
+        ValueError: If the run has neither completed nor warm-start trials
+    """
+    trials = _RunView(study, run_id).get_trials(deepcopy=False)
+    completed = [t for t in trials if t.state == TrialState.COMPLETE]
+    if completed:
+        return max(completed, key=lambda t: t.value)
+
+    warm_starts = [
+        t for t in trials if t.user_attrs.get(WARM_START_ATTR) and t.last_step is not None
+    ]
+    if not warm_starts:
+        raise ValueError(f"No completed trials for run {run_id}")
+    best = max(warm_starts, key=lambda t: (t.last_step, t.intermediate_values[t.last_step]))
+    logger.warning(
+        f"No completed trials for run {run_id}; using warm-start trial {best.number} "
+        f"(PR-AUC {best.intermediate_values[best.last_step]:.4f} at step {best.last_step})"
+    )
+    return best
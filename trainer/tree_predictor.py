@@ -0,0 +1,242 @@
+"""
+NumPy tree evaluator for small-batch prediction.
+
+For a handful of rows the fixed cost of ``xgb.Booster.predict`` (DMatrix
+construction, thread pool start-up) dominates. ``CompiledTreePredictor``
+compiles the booster's JSON model into flat arrays once and then walks all
+trees for a batch level by level with vectorized gathers.
+"""
+import json
+
+import numpy as np
+
+_SIGMOID_OBJECTIVES = {"binary:logistic", "reg:logistic"}
+_IDENTITY_OBJECTIVES = {"binary:logitraw", "reg:squarederror"}
+
+
+class CompiledTreePredictor:
+    """
+    Booster compiled into flat node arrays.
+
+    Nodes of all trees are concatenated; children hold global node indices and
+    leaves point to themselves, so every row can take ``max_depth`` steps
+    without branching on whether it already reached a leaf.
+    """
+
+    def __init__(
+        self,
+        roots,
+        split_feature,
+        threshold,
+        left,
+        right,
+        default_left,
+        cat_row,
+        cat_table,
+        leaf_value,
+        max_depth,
+        base_margin,
+        objective,
+        n_features,
+    ):
+        self.roots = roots
+        self.split_feature = split_feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Interleaved [right, left] pairs so one gather advances every row: children[2 * node + go_left]
+        self.children = np.column_stack([right, left]).ravel()
+        self.default_left = default_left
+        self.cat_row = cat_row
+        self.cat_table = cat_table
+        self.leaf_value = leaf_value
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.objective = objective
+        self.n_features = n_features
+
+    @property
+    def n_trees(self):
+        """Number of compiled trees."""
+        return len(self.roots)
+
+    @classmethod
+    def from_booster(cls, booster, best_iteration=None):
+        """
+        Compile a trained booster.
+
+        Args:
+            booster: Trained XGBoost booster (single-target gbtree)
+            best_iteration: Last boosting round to include; all rounds if None
+
+        Returns:
+            CompiledTreePredictor
+
+        Raises:
+            ValueError: If the booster type or objective is not supported
+        """
+        return cls.from_json(booster.save_raw(raw_format="json"), best_iteration)
+
+    @classmethod
+    def from_json(cls, model_json, best_iteration=None):
+        """
+        Compile an XGBoost JSON model (``Booster.save_raw("json")``).
+
+        Args:
+            model_json: JSON model as str/bytes or already parsed dictionary
+            best_iteration: Last boosting round to include; all rounds if None
+
+        Returns:
+            CompiledTreePredictor
+        """
+        if not isinstance(model_json, dict):
+            model_json = json.loads(model_json)
+        learner = model_json["learner"]
+        gbm = learner["gradient_booster"]
+        if gbm["name"] != "gbtree":
+            raise ValueError(f"Only gbtree boosters are supported, got {gbm['name']}")
+
+        model_param = learner["learner_model_param"]
+        if int(model_param["num_class"]) > 1 or int(model_param.get("num_target", 1)) > 1:
+            raise ValueError("Only single-target models are supported")
+
+        objective = learner["objective"]["name"]
+        if objective not in _SIGMOID_OBJECTIVES | _IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {objective}")
+        base_score = float(model_param["base_score"].strip("[]"))
+        if objective in _SIGMOID_OBJECTIVES:
+            base_margin = float(np.log(base_score / (1.0 - base_score)))
+        else:
+            base_margin = base_score
+
+        trees = gbm["model"]["trees"]
+        if best_iteration is not None:
+            iteration_indptr = gbm["model"]["iteration_indptr"]
+            trees = trees[: iteration_indptr[best_iteration + 1]]
+
+        return cls._compile(trees, base_margin, objective, int(model_param["num_feature"]))
+
+    @classmethod
+    def _compile(cls, trees, base_margin, objective, n_features):
+        """Concatenate per-tree node lists into global arrays."""
+        roots, split_feature, threshold, left, right = [], [], [], [], []
+        default_left, leaf_value, cat_row, cat_sets = [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for tree in trees:
+            n_nodes = len(tree["left_children"])
+            tree_left = np.asarray(tree["left_children"], dtype=np.int64)
+            tree_right = np.asarray(tree["right_children"], dtype=np.int64)
+            is_leaf = tree_left == -1
+            own = np.arange(n_nodes, dtype=np.int64)
+
+            roots.append(offset)
+            split_feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+            threshold.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+            left.append(np.where(is_leaf, own, tree_left) + offset)
+            right.append(np.where(is_leaf, own, tree_right) + offset)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            leaf_value.append(np.where(is_leaf, tree["split_conditions"], 0.0))
+
+            tree_cat_row = np.full(n_nodes, -1, dtype=np.int64)
+            for node, start, size in zip(
+                tree["categories_nodes"], tree["categories_segments"], tree["categories_sizes"]
+            ):
+                tree_cat_row[node] = len(cat_sets)
+                cat_sets.append(tree["categories"][start : start + size])
+            cat_row.append(tree_cat_row)
+
+            max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+            offset += n_nodes
+
+        width = max((max(cats) + 1 for cats in cat_sets if cats), default=0)
+        cat_table = np.zeros((len(cat_sets), width), dtype=bool)
+        for i, cats in enumerate(cat_sets):
+            cat_table[i, cats] = True
+
+        def concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+        return cls(
+            roots=np.asarray(roots, dtype=np.intp),
+            split_feature=concat(split_feature, np.intp),
+            threshold=concat(threshold, np.float32),
+            left=concat(left, np.intp),
+            right=concat(right, np.intp),
+            default_left=concat(default_left, bool),
+            cat_row=concat(cat_row, np.intp),
+            cat_table=cat_table,
+            leaf_value=concat(leaf_value, np.float64),
+            max_depth=max_depth,
+            base_margin=base_margin,
+            objective=objective,
+            n_features=n_features,
+        )
+
+    def predict(self, X, output_margin=False):
+        """
+        Predict for a batch of rows.
+
+        Args:
+            X: Feature matrix (NaN marks missing values, categoricals as codes)
+            output_margin: Return raw margins instead of transformed predictions
+
+        Returns:
+            Array of predictions, one per row
+
+        Raises:
+            ValueError: If X does not have one column per model feature
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+
+        n_rows, n_features = X.shape
+        if n_features != self.n_features:
+            raise ValueError(
+                f"Feature shape mismatch, expected: {self.n_features}, got {n_features}"
+            )
+        X_flat = X.ravel()
+        row_base = (np.arange(n_rows, dtype=np.intp) * n_features)[:, np.newaxis]
+        has_missing = np.isnan(X).any()
+        has_categorical = self.cat_table.shape[0] > 0
+
+        node = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            value = X_flat[row_base + self.split_feature[node]]
+            go_left = value < self.threshold[node]
+
+            if has_categorical:
+                row = self.cat_row[node]
+                is_cat = row >= 0
+                if is_cat.any():
+                    # XGBoost sends categories in the split set right, everything else left
+                    cat_value = value[is_cat]
+                    valid = (cat_value >= 0) & (cat_value < self.cat_table.shape[1])
+                    code = np.where(valid, cat_value, 0).astype(np.intp)
+                    go_left[is_cat] = ~(self.cat_table[row[is_cat], code] & valid)
+
+            if has_missing:
+                missing = np.isnan(value)
+                go_left[missing] = self.default_left[node[missing]]
+            node = self.children[2 * node + go_left]
+
+        margin = self.leaf_value[node].sum(axis=1) + self.base_margin
+        if output_margin or self.objective in _IDENTITY_OBJECTIVES:
+            return margin
+        return 1.0 / (1.0 + np.exp(-margin))
+
+
+def _tree_depth(left, right):
+    """Number of edges on the longest root-to-leaf path of one tree."""
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, node_depth = stack.pop()
+        if left[node] == -1:
+            depth = max(depth, node_depth)
+        else:
+            stack.append((left[node], node_depth + 1))
+            stack.append((right[node], node_depth + 1))
+    return depth
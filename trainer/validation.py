@@ -1,8 +1,9 @@
 """
 Configuration validation using Pydantic.
 """
+import os
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import yaml
 from pydantic import BaseModel, ConfigDict, Field, field_validator
@@ -40,6 +41,14 @@ class HyperparameterRange(BaseModel):
     type: str = Field(default="float", description="Parameter type: float or int")
 
 
+class MultiFidelityConfig(BaseModel):
+    """Successive-halving tuning on user subsamples."""
+
+    enabled: bool = Field(default=False, description="Tune on growing user subsamples")
+    reduction_factor: int = Field(default=3, ge=2, description="Growth factor between rungs")
+    n_rungs: int = Field(default=3, ge=2, description="Number of rungs including the full data")
+
+
 class ModelConfig(BaseModel):
     """Model training configuration."""
 
@@ -50,6 +59,14 @@ class ModelConfig(BaseModel):
     hyperparameter_ranges: dict[str, HyperparameterRange] = Field(
         default_factory=dict, description="Hyperparameter search ranges"
     )
+    study_storage: Optional[str] = Field(
+        default=None,
+        description="Optuna storage URL or journal file path for a persistent study",
+    )
+    warm_start_top_k: int = Field(
+        default=5, ge=0, description="Earlier trials re-evaluated at the start of a run"
+    )
+    multi_fidelity: MultiFidelityConfig = Field(default_factory=MultiFidelityConfig)
 
     model_config = ConfigDict(extra="allow")
 
@@ -66,6 +83,56 @@ class FeaturesConfig(BaseModel):
         return self.numeric + self.categorical
 
 
+class IncrementalConfig(BaseModel):
+    """Incremental retraining configuration."""
+
+    enabled: bool = Field(default=False, description="Continue the previous model when possible")
+    num_boost_round: int = Field(default=200, gt=0, description="Maximum trees appended per run")
+    window_months: Optional[int] = Field(
+        default=12, gt=0, description="Sliding window of training rows (None keeps all)"
+    )
+    half_life_months: Optional[float] = Field(
+        default=6.0, gt=0, description="Half-life of row weights (None disables decay)"
+    )
+    max_psi: float = Field(default=0.2, gt=0, description="Max feature PSI before a full retrain")
+    drift_features: Optional[List[str]] = Field(
+        default=None, description="Features checked for drift (None uses all numeric features)"
+    )
+    max_pr_auc_drop: float = Field(
+        default=0.02, ge=0, description="Max validation PR-AUC drop before a full retrain"
+    )
+    max_consecutive_runs: int = Field(
+        default=4, ge=0, description="Incremental runs before a full retrain is forced"
+    )
+
+
+class RegistryConfig(BaseModel):
+    """Model bundle output configuration."""
+
+    model_dir: str = Field(default="models", description="Directory holding model bundles")
+    model_name: str = Field(default="churn", description="Name of the published model")
+
+
+class PermutationImportanceConfig(BaseModel):
+    """Permutation importance on the validation and test sets."""
+
+    enabled: bool = Field(default=True, description="Compute permutation importance")
+    n_repeats: int = Field(default=5, ge=1, description="Permutations per feature")
+    n_workers: Optional[int] = Field(
+        default=None, ge=1, description="Worker processes (None: one per CPU)"
+    )
+
+
+class ResourcesConfig(BaseModel):
+    """CPU budgeting for XGBoost, Optuna and BLAS threads."""
+
+    cgroup_root: str = Field(default="/sys/fs/cgroup", description="cgroup filesystem mount point")
+    cpus: Optional[int] = Field(
+        default=None, ge=1, description="CPUs to use (None: detect from cgroup quota/affinity)"
+    )
+    trial_workers: int = Field(default=1, ge=1, description="Optuna trials run concurrently")
+
+
 class Config(BaseModel):
     """Main configuration."""
 
@@ -75,6 +142,12 @@ class Config(BaseModel):
     data: DataConfig
     model: ModelConfig
     features: FeaturesConfig
+    registry: RegistryConfig = Field(default_factory=RegistryConfig)
+    incremental: IncrementalConfig = Field(default_factory=IncrementalConfig)
+    permutation_importance: PermutationImportanceConfig = Field(
+        default_factory=PermutationImportanceConfig
+    )
+    resources: ResourcesConfig = Field(default_factory=ResourcesConfig)
 
     @field_validator("data")
     @classmethod
@@ -89,10 +162,22 @@ class Config(BaseModel):
         return v
 
 
+# Environment variables overriding config values: (section, key). The Vertex AI
+# pipeline sets them to paths on the mounted bucket, since the container's own
+# filesystem is discarded after each run.
+ENV_OVERRIDES = {
+    "CHURN_STUDY_STORAGE": ("model", "study_storage"),
+    "CHURN_MODEL_DIR": ("registry", "model_dir"),
+}
+
+
 def load_config(config_path: str = "config.yaml") -> Config:
     """
     Load and validate configuration from YAML file.
 
+    Values listed in ``ENV_OVERRIDES`` are replaced by their environment
+    variable when it is set.
+
     Args:
         config_path: Path to the YAML configuration file
 
@@ -111,4 +196,8 @@ def load_config(config_path: str = "config.yaml") -> Config:
     with open(config_file, "r") as f:
         config_dict = yaml.safe_load(f)
 
+    for env_var, (section, key) in ENV_OVERRIDES.items():
+        if os.environ.get(env_var):
+            config_dict.setdefault(section, {})[key] = os.environ[env_var]
+
     return Config(**config_dict)